@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+
+'''
+deterministic, offline generator of threat-report-like text for the tlp benchmarks.
+
+documents are built page by page: a boilerplate header, paragraphs of security
+prose with indicators sprinkled in at a configurable density, and a boilerplate
+footer - the repeated material tlp's text filter exists to strip.
+'''
+
+import random,hashlib
+
+__author__ = "{ ministry of promise }"
+__copyright__ = "Copyright 2015, { ministry of promise }"
+__license__ = "MIT"
+__version__ = "0.1.0"
+__maintainer__ = "Adam Nichols"
+__email__ = "adam.j.nichols@gmail.com"
+__status__ = "Development"
+
+VOCABULARY = (
+    u'the', u'attackers', u'deployed', u'a', u'backdoor', u'against', u'several', u'targets', u'in',
+    u'the', u'energy', u'sector', u'and', u'used', u'spearphishing', u'emails', u'with', u'malicious',
+    u'attachments', u'to', u'gain', u'initial', u'access', u'the', u'implant', u'beacons', u'to', u'its',
+    u'command', u'server', u'over', u'http', u'and', u'downloads', u'additional', u'modules', u'for',
+    u'credential', u'theft', u'lateral', u'movement', u'and', u'exfiltration', u'we', u'assess', u'with',
+    u'moderate', u'confidence', u'that', u'the', u'group', u'is', u'financially', u'motivated', u'analysts',
+    u'observed', u'the', u'dropper', u'installing', u'a', u'loader', u'which', u'decrypts', u'the',
+    u'payload', u'in', u'memory', u'persistence', u'is', u'achieved', u'through', u'a', u'scheduled',
+    u'task', u'miscreants', u'infrastructure', u'overlaps', u'with', u'previous', u'campaigns', u'of',
+)
+
+TLDS = (u'com', u'net', u'org', u'info', u'ru', u'cn', u'co.uk', u'biz', u'io', u'de')
+
+HEADER = u'%(vendor)s Threat Intelligence Report  TLP: %(color)s  Page %(page)d'
+FOOTER = u'Copyright %(vendor)s. All rights reserved. Distribution restricted to named recipients.'
+
+
+class CorpusGenerator:
+    '''
+    builds synthetic reports.  the same seed and settings always produce the same text.
+
+        size         - approximate document size, in characters
+        ioc_density  - indicators per 100 words of prose
+        defang       - fraction of domains/ips written defanged (evil[.]com, hxxp://)
+        page_words   - words of prose between each boilerplate header and footer
+    '''
+
+    def __init__(self, seed=0, ioc_density=1.0, defang=0.25, page_words=400, vendor=u'Example Security', color=u'WHITE'):
+
+        self.seed = seed
+        self.ioc_density = ioc_density
+        self.defang = defang
+        self.page_words = page_words
+        self.vendor = vendor
+        self.color = color
+
+
+    def _ioc(self, rng):
+
+        kind = rng.choice(('ip', 'domain', 'domain', 'md5', 'sha1', 'sha256', 'cve'))
+        if kind == 'ip':
+            ioc = u'.'.join([unicode(rng.randint(1, 254)) for i in range(4)])
+        elif kind == 'domain':
+            labels = [u''.join([rng.choice(u'abcdefghijklmnopqrstuvwxyz') for i in range(rng.randint(4, 12))])
+                      for j in range(rng.randint(1, 2))]
+            ioc = u'.'.join(labels + [rng.choice(TLDS)])
+            if rng.random() < 0.3:
+                ioc = u'http://' + ioc + u'/' + rng.choice((u'gate.php', u'index.html', u'update'))
+        elif kind in ('md5', 'sha1', 'sha256'):
+            ioc = unicode(hashlib.new(kind, str(rng.getrandbits(64))).hexdigest())
+        else:
+            ioc = u'CVE-%d-%04d' % (rng.randint(2005, 2015), rng.randint(1, 9999))
+
+        if kind in ('ip', 'domain') and rng.random() < self.defang:
+            ioc = ioc.replace(u'http://', u'hxxp://').replace(u'.', u'[.]')
+        return ioc
+
+
+    def _page(self, rng, page):
+
+        lines = [HEADER % {'vendor': self.vendor, 'color': self.color, 'page': page}, u'']
+        sentence = []
+        paragraph = []
+        for i in range(self.page_words):
+            if rng.random() * 100 < self.ioc_density:
+                sentence.append(self._ioc(rng))
+            else:
+                sentence.append(rng.choice(VOCABULARY))
+            if len(sentence) >= rng.randint(8, 20):
+                if sentence[0] in VOCABULARY:
+                    sentence[0] = sentence[0].capitalize()
+                paragraph.append(u' '.join(sentence) + u'.')
+                sentence = []
+            if len(paragraph) >= 5:
+                lines.append(u' '.join(paragraph))
+                lines.append(u'')
+                paragraph = []
+        if len(sentence) > 0:
+            paragraph.append(u' '.join(sentence) + u'.')
+        if len(paragraph) > 0:
+            lines.append(u' '.join(paragraph))
+        lines.append(u'')
+        lines.append(FOOTER % {'vendor': self.vendor})
+        return u'\n'.join(lines) + u'\n\n'
+
+
+    def document(self, size=100000, index=0):
+        '''returns a single report of roughly size characters'''
+
+        rng = random.Random('%s-%s' % (self.seed, index))
+        pages = []
+        length = 0
+        page = 1
+        while length < size:
+            text = self._page(rng, page)
+            pages.append(text)
+            length += len(text)
+            page += 1
+        return u''.join(pages)[:size]
+
+
+    def documents(self, count, size=100000):
+        '''yields count reports of roughly size characters'''
+
+        for index in range(count):
+            yield self.document(size, index)
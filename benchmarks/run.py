@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+
+'''
+benchmarks for the tlp pipeline stages over a synthetic corpus (see corpus.py).
+
+each stage is timed on a fresh TLP, so every number includes the lazily built
+stages it depends on.  results go to stdout, and optionally to a json file so
+runs can be compared across releases:
+
+    python benchmarks/run.py --size 1000000 --repeat 3 --json before.json
+
+the time taken by `from tlp import TLP` is measured too, in fresh interpreters.
+--check-import fails the run if it is over IMPORT_BUDGET, or if the import pulled
+in any of the modules only the nlp stages should load:
+
+    python benchmarks/run.py --check-import --stage iocs
+'''
+
+import os,sys,time,json,argparse,platform,multiprocessing,subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from corpus import CorpusGenerator
+from tlp import TLP, TLPFilter
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+__author__ = "{ ministry of promise }"
+__copyright__ = "Copyright 2015, { ministry of promise }"
+__license__ = "MIT"
+__version__ = "0.1.0"
+__maintainer__ = "Adam Nichols"
+__email__ = "adam.j.nichols@gmail.com"
+__status__ = "Development"
+
+timer = getattr(time, 'monotonic', time.time)
+
+# seconds `from tlp import TLP` may take, and the modules it must not import
+
+IMPORT_BUDGET = 0.25
+LAZY_MODULES = ['nltk', 'textblob', 'numpy', 'pkg_resources']
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_PROBE = '''
+import sys,time,json
+sys.path.insert(0, %r)
+start = time.time()
+from tlp import TLP
+print json.dumps([time.time() - start, [m for m in %r if m in sys.modules]])
+'''
+
+# stage name -> callable run against the document text
+
+STAGES = [
+    ('filter_text', lambda text: TLPFilter().text(text)),
+    ('iocs', lambda text: TLP(text).iocs),
+    ('keywords', lambda text: TLP(text).keywords),
+    ('summary', lambda text: TLP(text).summary),
+    ('color', lambda text: TLP(text).color),
+]
+
+
+def _rss_growth(func, text, conn):
+
+    import resource
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    func(text)
+    conn.send((resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before) * 1024)
+    conn.close()
+
+
+def peak_memory(func, text):
+    '''
+    returns the peak bytes allocated by func - via tracemalloc where available,
+    otherwise the max rss growth of a forked child running it
+    '''
+
+    if tracemalloc is not None:
+        tracemalloc.start()
+        try:
+            func(text)
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    (parent, child) = multiprocessing.Pipe(False)
+    process = multiprocessing.Process(target=_rss_growth, args=(func, text, child))
+    process.start()
+    peak = parent.recv()
+    process.join()
+    return peak
+
+
+def bench(text, stages, repeat):
+
+    size = len(text.encode('utf8'))
+    results = dict()
+    for (name, func) in STAGES:
+        if stages and name not in stages:
+            continue
+        # warm the process-wide state (tagger, suffix list) outside the timings
+        func(text)
+        times = []
+        for i in range(repeat):
+            start = timer()
+            func(text)
+            times.append(timer() - start)
+        best = min(times)
+        results[name] = dict({
+            'seconds': times,
+            'best': best,
+            'mb_per_sec': (size / 1048576.0) / best if best > 0 else None,
+            'peak_bytes': peak_memory(func, text),
+        })
+    return results
+
+
+def import_time(repeat):
+    '''returns the best time for `from tlp import TLP` in a new interpreter, and the lazy modules it imported'''
+
+    times = []
+    loaded = set()
+    for i in range(max(1, repeat)):
+        output = subprocess.check_output([sys.executable, '-c', IMPORT_PROBE % (ROOT, LAZY_MODULES)])
+        (seconds, modules) = json.loads(output.strip().splitlines()[-1])
+        times.append(seconds)
+        loaded.update(modules)
+    return dict({'seconds': times, 'best': min(times), 'budget': IMPORT_BUDGET, 'loaded': sorted(loaded)})
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description='benchmark the tlp pipeline stages')
+    parser.add_argument('--size', type=int, default=200000, help='document size, in characters')
+    parser.add_argument('--ioc-density', type=float, default=1.0, help='iocs per 100 words')
+    parser.add_argument('--defang', type=float, default=0.25, help='fraction of defanged indicators')
+    parser.add_argument('--page-words', type=int, default=400, help='words between boilerplate headers/footers')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--stage', action='append', dest='stages', help='only run this stage (repeatable)')
+    parser.add_argument('--json', dest='json_path', help='write results to this file')
+    parser.add_argument('--check-import', action='store_true', help='exit non-zero if importing tlp is over budget')
+    args = parser.parse_args(argv)
+
+    generator = CorpusGenerator(seed=args.seed, ioc_density=args.ioc_density, defang=args.defang, page_words=args.page_words)
+    text = generator.document(args.size)
+
+    report = dict({
+        'corpus': dict({'size': args.size, 'bytes': len(text.encode('utf8')), 'ioc_density': args.ioc_density,
+                        'defang': args.defang, 'page_words': args.page_words, 'seed': args.seed}),
+        'python': platform.python_version(),
+        'memory': 'tracemalloc' if tracemalloc is not None else 'rss',
+        'import': import_time(args.repeat),
+        'stages': bench(text, args.stages, args.repeat),
+    })
+
+    imported = report['import']
+    print '%-12s %9.4fs (budget %.2fs)%s' % ('import', imported['best'], imported['budget'],
+                                             ', loaded ' + ' '.join(imported['loaded']) if imported['loaded'] else '')
+
+    for (name, result) in sorted(report['stages'].items()):
+        print '%-12s %9.4fs %9.3f MB/s %12d bytes peak' % (name, result['best'], result['mb_per_sec'] or 0, result['peak_bytes'])
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    if args.check_import and (imported['best'] > imported['budget'] or imported['loaded']):
+        sys.exit('importing tlp is over budget')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,6 @@
-import os
+import os,sys,subprocess
 from setuptools import setup, find_packages
+from setuptools.command.build_py import build_py
 from pkg_resources import resource_filename, Requirement
 
 # Utility function to read the README file.
@@ -10,6 +11,23 @@ def read(fname):
     with open(fname) as f:
         return f.read()
 
+# Precompiles the filter tables into tlp/lib/filter_data.bin alongside the built
+# modules, so installed copies skip parsing the public suffix list and filter lists
+# at startup.  It runs with the interpreter doing the install, since the artifact is
+# only used by a matching python version.  Failures are only warnings - tlp falls
+# back to the source lists.
+class build_py_with_filter_data(build_py):
+
+    def run(self):
+        build_py.run(self)
+        if self.dry_run:
+            return
+        lib_dir = os.path.join(self.build_lib, 'tlp', 'lib')
+        try:
+            subprocess.check_call([sys.executable, '-c', 'import compiled_data; compiled_data.build()'], cwd=lib_dir)
+        except (OSError, subprocess.CalledProcessError) as e:
+            self.warn('could not precompile tlp filter data: %s' % e)
+
 setup(
     name = "tlp",
     version = "0.1.1",
@@ -23,6 +41,7 @@ setup(
     packages=find_packages(),
     package_dir={'tlp': 'tlp'},
     package_data={'tlp': ['lib/effective_tld_names.dat']},
+    cmdclass={'build_py': build_py_with_filter_data},
     long_description=read('README.md'),
     classifiers=[
         "Development Status :: 3 - Alpha",
@@ -32,7 +51,6 @@ setup(
     install_requires=[
         'nltk', 
         'textblob', 
-        'python-Levenshtein',
         'numpy'
     ]
 )
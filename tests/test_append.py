@@ -0,0 +1,84 @@
+import random
+import unittest
+
+from tlp import TLP
+from tlp.tlp_stream import stream_iocs
+
+SENTENCES = [
+    u'The loader beacons to evil-domain[.]com and to 10.0.0[.]1 every %d minutes.',
+    u'Analysts recovered the credential module from hxxp://bad-host[.]example[.]org/update/%d.bin.',
+    u'The credential module matches the hash d41d8cd98f00b204e9800998ecf8427e and stores %d credentials locally.',
+    u'Lateral movement on day %d used stolen credentials and a scheduled task that relaunched the loader.',
+    u'The loader contacted second-stage[dot]example[.]net when server %d was unreachable.',
+    u'Infrastructure at 192.168.13[.]37 overlaps with %d servers seen in earlier credential theft campaigns.',
+    u'Operators harvested credentials from browsers on %d hosts before moving to the domain controller.',
+    u'The spearphishing attachment installed the loader on %d workstations in the finance department.',
+]
+
+
+def document():
+
+    rng = random.Random(0)
+    paragraphs = [u'TLP: AMBER']
+    for i in range(16):
+        paragraphs.append(u' '.join(rng.choice(SENTENCES) % rng.randint(2, 999) for j in range(4)))
+    return u'\n\n'.join(paragraphs)
+
+
+TEXT = document()
+
+
+def results(tlp):
+    # keywords past the cut-off are rare in a short text, so compare the counts under them too
+    return (tlp.iocs, tlp.color, tlp.keywords, dict(tlp._keyword_counts), tlp.debug['keywords'], tlp.text, tlp.summary)
+
+
+class AppendTest(unittest.TestCase):
+
+    def check(self, cuts):
+
+        cuts = sorted(set(cuts))
+        pieces = [TEXT[a:b] for (a, b) in zip([0] + cuts, cuts + [len(TEXT)])]
+        tlp = TLP(pieces[0])
+        results(tlp)
+        for piece in pieces[1:]:
+            tlp.append(piece)
+            tlp.iocs
+            tlp.color
+        self.assertEqual(results(tlp), self.expected)
+
+
+    def setUp(self):
+        self.expected = results(TLP(TEXT))
+
+
+    def test_random_cuts(self):
+
+        for seed in range(3):
+            self.check(random.Random(seed).sample(range(1, len(TEXT)), 30))
+
+
+    def test_cuts_inside_defangs_and_words(self):
+        # in the middle of each '[.]', and of a word the keywords count
+        cuts = [i + 1 for i in range(len(TEXT)) if TEXT[i] == u'['] + [i + 2 for i in range(len(TEXT)) if TEXT[i] == u'[']
+        cuts += [i + 3 for i in range(len(TEXT)) if TEXT.startswith(u'credential', i)]
+        self.check(cuts)
+
+
+    def test_long_ioc(self):
+        # too long to hold back while it grows, so append and the stream both settle it,
+        # and the host derived from it, as far as it had got
+        text = u'payload at hxxp://long-host[.]example[.]net/' + u'a' * 3000 + u'/x.php and more ' * 20
+        pieces = [text[i:i + 100] for i in range(0, len(text), 100)]
+        tlp = TLP(pieces[0])
+        tlp.iocs
+        for piece in pieces[1:]:
+            tlp.append(piece)
+            tlp.iocs
+        self.assertEqual(set(stream_iocs(pieces)), set((name, ioc) for name in tlp.iocs for ioc in tlp.iocs[name]))
+        self.assertTrue(u'long-host.example.net' in tlp.iocs['domain'])
+        self.assertEqual(len(tlp.iocs['url']), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import sys
+import StringIO
+import unittest
+
+from tlp.tlp_batch import Analyzer, analyze
+
+
+class AnalyzerTest(unittest.TestCase):
+
+    def test_repeated_ordered_imap(self):
+        # each imap() keeps its own release position, so later calls start from 0 again
+        documents = [u'document %d names evil-domain.com' % i for i in range(5)]
+        analyzer = Analyzer(workers=2, executor='thread', stages=('iocs',))
+        try:
+            for i in range(4):
+                self.assertEqual([r['index'] for r in analyzer.imap(documents)], range(5))
+                self.assertEqual(sorted(r['index'] for r in analyzer.imap(documents, ordered=False)), range(5))
+        finally:
+            analyzer.close()
+
+
+
+    def test_raising_callback(self):
+        # the callback runs on the pool's result thread, which must survive it
+        def callback(result):
+            raise ValueError('callback failed')
+
+        analyzer = Analyzer(workers=2, executor='thread', stages=('iocs',))
+        (stderr, sys.stderr) = (sys.stderr, StringIO.StringIO())
+        try:
+            analyzer.submit(u'first evil-domain.com', callback=callback).get(5)
+            self.assertEqual(analyzer.submit(u'second evil-domain.com').get(5)['error'], None)
+        finally:
+            (sys.stderr, printed) = (stderr, sys.stderr.getvalue())
+            analyzer.close()
+        self.assertTrue('callback failed' in printed)
+
+
+    def test_imap_dead_pool(self):
+        # imap raises, rather than waiting forever, once the pool can't return results
+        analyzer = Analyzer(workers=2, executor='thread', stages=('iocs',))
+        results = analyzer.imap(u'document %d' % i for i in range(1000))
+        next(results)
+        analyzer._pool.terminate()
+        self.assertRaises(RuntimeError, list, results)
+
+
+class AnalyzeTest(unittest.TestCase):
+
+    def test_bad_document_error(self):
+        # the error recorded is the document's own, not one from a half-built TLP
+        self.assertTrue('TypeError' in analyze((0, 123, ('iocs',)))['error'])
+        self.assertTrue('UnicodeDecodeError' in analyze((0, '\xff\xfe', ('iocs',)))['error'])
+        self.assertEqual(analyze((0, 'plain evil-domain.com', ('iocs',)))['error'], None)
+
+
+
+if __name__ == '__main__':
+    unittest.main()
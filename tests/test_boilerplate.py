@@ -0,0 +1,42 @@
+import unittest
+
+from tlp import TLP, TLPFilter
+from tlp.lib.boilerplate import BoilerplateStore
+
+
+class FingerprintTest(unittest.TestCase):
+
+    def test_folds_pages_and_dates(self):
+
+        fingerprint = BoilerplateStore.fingerprint
+        for (a, b) in [(u'Page 3 of 40', u'page 4 of 40'),
+                       (u'- 12 -', u'- 13 -'),
+                       (u'Published 2016-03-04 by Vendor', u'Published 2017-11-30 by Vendor'),
+                       (u'report date: March 4, 2016', u'report date: Nov 30th, 2017'),
+                       (u'(c) 2016 Vendor Inc.', u'(c) 2015-2017 Vendor Inc.')]:
+            self.assertEqual(fingerprint(a), fingerprint(b))
+
+
+    def test_keeps_content_numbers(self):
+
+        fingerprint = BoilerplateStore.fingerprint
+        for (a, b) in [(u'the loader called sample0 drops a file', u'the loader called sample3 drops a file'),
+                       (u'c2 at 10.0.0.1 port 443', u'c2 at 10.0.0.2 port 443'),
+                       (u'version 2.1.3 is affected', u'version 2.1.4 is affected')]:
+            self.assertNotEqual(fingerprint(a), fingerprint(b))
+
+
+    def test_content_survives(self):
+        # lines differing only in a sample number used to fold together and be dropped after min_count documents
+        tlpfilter = TLPFilter(boilerplate=BoilerplateStore())
+        for i in range(5):
+            text = (u'Vendor threat report, page %d of 9\n'
+                    u'The loader called sample%d drops a second stage payload and contacts evil-domain.com.\n'
+                    u'Copyright 201%d Vendor Inc.\n' % (i + 1, i, i))
+            tlp = TLP(text, source='vendor', tlpfilter=tlpfilter)
+            self.assertTrue((u'sample%d' % i) in tlp.text)
+            self.assertFalse(u'Copyright' in tlp.text)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import random
+import unittest
+
+from tlp.lib.edit_distance import edit_distance
+
+
+def reference(a, b):
+
+    row = range(len(b) + 1)
+    for (i, x) in enumerate(a):
+        previous, row = row, [i + 1]
+        for (j, y) in enumerate(b):
+            row.append(min(previous[j + 1] + 1, row[j] + 1, previous[j] + (x != y)))
+    return row[-1]
+
+
+class EditDistanceTest(unittest.TestCase):
+
+    def test_matches_reference(self):
+
+        rng = random.Random(1)
+        for i in range(2000):
+            a = u''.join(rng.choice(u'abc d') for k in range(rng.randint(0, 20)))
+            b = u''.join(rng.choice(u'abc d') for k in range(rng.randint(0, 20)))
+            self.assertEqual(edit_distance(a, b), reference(a, b), (a, b))
+
+
+    def test_limit(self):
+        # under the limit the distance is exact, otherwise only known to reach it
+        rng = random.Random(2)
+        for i in range(2000):
+            a = u''.join(rng.choice(u'abc d') for k in range(rng.randint(0, 20)))
+            b = u''.join(rng.choice(u'abc d') for k in range(rng.randint(0, 20)))
+            (distance, limit) = (reference(a, b), rng.randint(0, 20))
+            if distance < limit:
+                self.assertEqual(edit_distance(a, b, limit), distance)
+            else:
+                self.assertTrue(edit_distance(a, b, limit) >= limit)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+
+from tlp import TLP, TLPFilter
+from tlp.lib.extractors import valid_bitcoin, default_extractors, Extractor
+
+
+class ValidBitcoinTest(unittest.TestCase):
+
+    def test_checksums(self):
+
+        self.assertTrue(valid_bitcoin('1A1zP1eP5QGefi2DMPTfTL5SLmv7DivfNa'))
+        self.assertTrue(valid_bitcoin('3J98t1WpEZ73CNmQviecrnyiWrnqRhWNLy'))
+        self.assertTrue(valid_bitcoin('bc1qar0srrr7xfkvy5l643lydnw9re59gtzzwf5mdq'))
+        self.assertFalse(valid_bitcoin('3J98t1WpEZ73CNmQviecrnyiWrnqRhWNLz'))
+
+
+    def test_out_of_range(self):
+        # 35 base58 digits can overflow 25 bytes, which used to raise from the hex decode
+        self.assertFalse(valid_bitcoin('3' + 'z' * 34))
+
+
+    def test_scan_survives_out_of_range(self):
+
+        tlp = TLP(u'wallet 3' + u'z' * 34 + u' and 3J98t1WpEZ73CNmQviecrnyiWrnqRhWNLy')
+        self.assertEqual(set(tlp.iocs['bitcoin']), set([u'3J98t1WpEZ73CNmQviecrnyiWrnqRhWNLy']))
+
+
+
+class RegistryTest(unittest.TestCase):
+
+    def test_shared_registry_is_frozen(self):
+        # every default filter shares one registry, so none of them may change it
+        extractors = TLPFilter().extractors
+        self.assertRaises(ValueError, extractors.unregister, 'domain')
+        self.assertRaises(ValueError, extractors.register, Extractor('ticket', r'INC-\d{6}'))
+        self.assertTrue('domain' in TLPFilter().extractors)
+
+
+    def test_supplied_registry_is_frozen(self):
+
+        extractors = default_extractors()
+        extractors.register(Extractor('ticket', r'(?<![0-9a-zA-Z_])INC-\d{6}(?![0-9a-zA-Z_])', prefilter='INC-'), before='domain')
+        tlpfilter = TLPFilter(extractors=extractors)
+        self.assertRaises(ValueError, extractors.unregister, 'ticket')
+        self.assertEqual(set(TLP(u'see INC-204719', tlpfilter=tlpfilter).iocs['ticket']), set([u'INC-204719']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import os
+import random
+import tempfile
+import unittest
+
+from tlp import TLP, TLPFilter
+
+
+class DomainAllowlistTest(unittest.TestCase):
+
+    text = u'seen: evil-domain.com, cdn.partner-site.net and sub.bad-actor.net'
+
+
+    def test_list(self):
+
+        tlpfilter = TLPFilter(domain_allowlist=[u'Partner-Site.net'])
+        self.assertEqual(set(TLP(self.text, tlpfilter=tlpfilter).iocs['domain']),
+                         set([u'evil-domain.com', u'sub.bad-actor.net']))
+        # the built-in allowlist still applies
+        self.assertTrue(u'google.com' in tlpfilter.domain_filterlist)
+
+
+    def test_ranked_file(self):
+
+        (fd, path) = tempfile.mkstemp()
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write('# rank,domain\n1,partner-site.net\n2,bad-actor.net\n')
+            tlpfilter = TLPFilter(domain_allowlist=path)
+        finally:
+            os.remove(path)
+        self.assertEqual(set(TLP(self.text, tlpfilter=tlpfilter).iocs['domain']), set([u'evil-domain.com']))
+
+
+    def test_fingerprint(self):
+
+        self.assertNotEqual(TLPFilter().fingerprint, TLPFilter(domain_allowlist=[u'a.com']).fingerprint)
+        self.assertNotEqual(TLPFilter(domain_allowlist=[u'a.com']).fingerprint,
+                            TLPFilter(domain_allowlist=[u'b.com']).fingerprint)
+        self.assertEqual(TLPFilter(domain_allowlist=[u'a.com']).fingerprint,
+                         TLPFilter(domain_allowlist=[u'a.com']).fingerprint)
+
+
+class PreFilterTest(unittest.TestCase):
+
+    def test_list_and_lazy(self):
+
+        tlpfilter = TLPFilter()
+        text = u'c2 at evil-domain[.]com  and\t10.0.0[.]1 '
+        tokens = tlpfilter.iocs(text, mode='pre')
+        # a list, empty tokens included, as before
+        self.assertEqual(type(tokens), list)
+        self.assertEqual(tokens, tlpfilter.normalize(text).split(u' '))
+        self.assertTrue(u'evil-domain.com' in tokens and u'' in tokens)
+        self.assertEqual(list(tlpfilter.iocs(text, mode='pre', lazy=True)), tokens)
+
+
+
+
+class NearDuplicateTest(unittest.TestCase):
+
+    notice = (u'This report is provided for informational purposes only and is not intended to be legal advice. '
+              u'The information contained herein is subject to change without notice and is provided as is, without '
+              u'warranty of any kind, express or implied. Redistribution is prohibited without prior written consent.')
+
+    def test_long_paragraphs(self):
+        # whole paragraphs share most of their character bigrams with any long notice,
+        # which must not make them near-duplicates of it
+        rng = random.Random(4)
+        words = (u'the attackers deployed a backdoor against several targets in the energy sector and used '
+                 u'spearphishing emails with malicious attachments to gain initial access while the implant '
+                 u'beacons to its command server over http and downloads modules for credential theft').split()
+        paragraphs = [u' '.join(rng.choice(words) for i in range(rng.randint(40, 80))) for j in range(40)]
+        lines = [self.notice] * 4 + paragraphs
+        lines += [self.notice.replace(u'legal advice', u'legal guidance'), self.notice.replace(u'.', u'')]
+        rng.shuffle(lines)
+
+        text = TLPFilter().dedupe_lines(lines)
+        self.assertFalse(u'informational purposes' in text)
+        for paragraph in paragraphs:
+            self.assertTrue(paragraph in text)
+
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,21 @@
+import os
+import sys
+import unittest
+
+# the budget, the lazy modules and the probe live with the benchmarks, which check them too
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+
+from run import import_time
+
+
+class ImportTest(unittest.TestCase):
+
+    def test_import(self):
+        # best of three, so a busy machine doesn't fail the budget
+        result = import_time(3)
+        self.assertEqual(result['loaded'], [])
+        self.assertLess(result['best'], result['budget'])
+
+
+if __name__ == '__main__':
+    unittest.main()
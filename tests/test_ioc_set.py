@@ -0,0 +1,39 @@
+import pickle
+import unittest
+
+from tlp.lib.ioc_set import IOCSet
+
+MD5 = u'D41D8CD98F00B204E9800998ECF8427E'
+
+
+class IOCSetTest(unittest.TestCase):
+
+    def test_hash_case(self):
+        # membership and equality agree on hashes in either case
+        iocs = IOCSet('md5', [MD5])
+        self.assertTrue(MD5 in iocs)
+        self.assertEqual(iocs, set([MD5]))
+        self.assertEqual(iocs, set([MD5.lower()]))
+        self.assertEqual(list(iocs), [MD5.lower()])
+
+
+    def test_not_equal(self):
+
+        iocs = IOCSet('md5', [MD5])
+        self.assertNotEqual(iocs, set([u'not a hash']))
+        self.assertNotEqual(iocs, set([MD5, u'0' * 32]))
+        self.assertNotEqual(iocs, set())
+        self.assertNotEqual(IOCSet('ip', [u'10.0.0.1']), set([10]))
+
+
+    def test_sets(self):
+
+        ips = IOCSet('ip', [u'10.0.0.2', u'10.0.0.1'])
+        self.assertEqual(list(ips), [u'10.0.0.1', u'10.0.0.2'])
+        self.assertEqual(ips | set([u'10.0.0.3']), set([u'10.0.0.1', u'10.0.0.2', u'10.0.0.3']))
+        self.assertEqual(ips - set([u'10.0.0.1']), set([u'10.0.0.2']))
+        self.assertEqual(pickle.loads(pickle.dumps(ips)), ips)
+
+
+if __name__ == '__main__':
+    unittest.main()
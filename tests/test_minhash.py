@@ -0,0 +1,53 @@
+import random
+import unittest
+
+from tlp.lib.minhash import MinHashIndex
+
+FOOTER = u'copyright 2015 { ministry of promise } - tlp: white - distribution unlimited, page 12'
+
+
+def substitute(text, count, rng):
+
+    chars = list(text)
+    for i in rng.sample(range(len(chars)), count):
+        chars[i] = rng.choice(u'abcdefghijklmnopqrstuvwxyz0123456789 ')
+    return u''.join(chars)
+
+
+class MinHashIndexTest(unittest.TestCase):
+
+    def test_near_duplicates(self):
+        # TLPFilter's edit distance < 35% rule drops all of these, so the candidates it
+        # measures (bigrams at 1 - 2 * 0.35) must include the footer every time
+        rng = random.Random(9)
+        index = MinHashIndex(threshold=0.3, shingle_size=2)
+        index.add(FOOTER)
+        for count in (5, 10, 14, 20, 25):
+            found = sum(FOOTER in index.candidates(substitute(FOOTER, count, rng)) for i in range(50))
+            self.assertEqual(found, 50, '%d substitutions' % count)
+
+
+    def test_unrelated(self):
+
+        index = MinHashIndex(threshold=0.35, shingle_size=2)
+        index.add(FOOTER)
+        self.assertIsNone(index.query(u'the loader beacons to its command and control server every ten minutes'))
+
+
+    def test_finds_every_pair_over_threshold(self):
+        # candidates from the lsh buckets miss nothing the exact jaccard check accepts
+        rng = random.Random(3)
+        index = MinHashIndex(threshold=0.5)
+        indexed = [u''.join(rng.choice(u'abcdefghij ') for i in range(80)) for j in range(20)]
+        for text in indexed:
+            index.add(text)
+        for i in range(500):
+            variant = substitute(rng.choice(indexed), rng.randint(0, 30), rng)
+            shingles = index.shingles(variant)
+            expected = any(len(set(shingles) & set(index.shingles(text))) / float(len(set(shingles) | set(index.shingles(text)))) >= 0.5
+                           for text in indexed)
+            self.assertEqual(index.query(variant) is not None, expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from tlp.lib.public_suffix import PublicSuffixList, public_suffix_list
+
+
+class PublicSuffixTest(unittest.TestCase):
+
+    def check(self, psl, expected):
+
+        for (domain, suffix) in expected:
+            self.assertEqual(psl.public_suffix(domain), suffix, domain)
+
+
+    def test_plain_rules(self):
+
+        self.check(public_suffix_list(), [(u'bbc.co.uk', u'co.uk'),
+                                          (u'www.bbc.co.uk', u'co.uk'),
+                                          (u'EXAMPLE.COM.', u'com'),
+                                          (u'example.notatld', None)])
+
+
+    def test_wildcards_and_exceptions(self):
+        # *.kawasaki.jp with !city.kawasaki.jp, and *.ck with !www.ck
+        self.check(public_suffix_list(), [(u'kawasaki.jp', u'jp'),
+                                          (u'a.b.kawasaki.jp', u'b.kawasaki.jp'),
+                                          (u'city.kawasaki.jp', u'kawasaki.jp'),
+                                          (u'www.city.kawasaki.jp', u'kawasaki.jp'),
+                                          (u'test.ck', u'test.ck'),
+                                          (u'b.test.ck', u'test.ck'),
+                                          (u'www.ck', u'ck'),
+                                          (u'www.www.ck', u'ck')])
+
+
+    def test_punycode(self):
+        # idn rules are indexed as written and as punycode
+        self.check(public_suffix_list(), [(u'食狮.公司.cn', u'公司.cn'),
+                                          (u'xn--85x722f.xn--55qx5d.cn', u'xn--55qx5d.cn'),
+                                          (u'site.xn--p1ai', u'xn--p1ai')])
+
+
+    def test_custom_rules(self):
+
+        psl = PublicSuffixList([u'test', u'*.wild.test', u'!keep.wild.test', u'例え.test'])
+        self.check(psl, [(u'a.test', u'test'),
+                         (u'a.b.wild.test', u'b.wild.test'),
+                         (u'a.keep.wild.test', u'wild.test'),
+                         (u'a.xn--r8jz45g.test', u'xn--r8jz45g.test'),
+                         (u'a.例え.test', u'例え.test'),
+                         (u'a.com', None)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+
+from tlp import TLP
+from tlp.lib.refang import refang, MAX_DEFANG
+
+TEXT = (u'see hxxp://evil[.]example[dot]com/a and bad{.}org, mail x[@]bad(.)net, '
+        u'hXXps://cdn[.]example[.]net/q from 192.168.1[.]7 and [10.0.0.1]')
+
+
+class RefangTest(unittest.TestCase):
+
+    def test_forms(self):
+
+        self.assertEqual(refang(TEXT)[0], u'see http://evil.example.com/a and bad.org, mail x@bad.net, '
+                                          u'hTTps://cdn.example.net/q from 192.168.1.7 and 10.0.0.1')
+
+
+    def test_offsets(self):
+        # characters that came through unchanged map back to themselves
+        (normalized, offsets, consumed) = refang(TEXT)
+        self.assertEqual(consumed, len(TEXT))
+        for (i, c) in enumerate(normalized):
+            if c.isalnum() and c not in u'tT':
+                self.assertEqual(TEXT[offsets.original(i)], c)
+
+
+    def test_hold_back(self):
+        # pieces refanged with final=False, the unconsumed rest carried on, match the whole
+        for cut in range(1, len(TEXT)):
+            (first, offsets, consumed) = refang(TEXT[:cut], final=False)
+            self.assertTrue(consumed >= cut - (MAX_DEFANG - 1))
+            self.assertEqual(first + refang(TEXT[consumed:])[0], refang(TEXT)[0], 'cut at %d' % cut)
+
+
+class IOCOffsetsTest(unittest.TestCase):
+
+    expected = [(u'domain', u'evil.example.com', u'evil[.]example[dot]com'),
+                (u'domain', u'bad.org', u'bad{.}org'),
+                (u'email', u'x@bad.net', u'x[@]bad(.)net'),
+                (u'ip', u'192.168.1.7', u'192.168.1[.]7'),
+                (u'ip', u'10.0.0.1', u'10.0.0.1'),
+                (u'url', u'http://evil.example.com/a', u'hxxp://evil[.]example[dot]com/a'),
+                (u'url', u'hTTps://cdn.example.net/q', u'hXXps://cdn[.]example[.]net/q')]
+
+
+    def check(self, tlp):
+
+        offsets = tlp.ioc_offsets
+        for (name, ioc, original) in self.expected:
+            spans = [(start, end) for (start, end, found) in offsets[name] if found == ioc]
+            self.assertEqual([TEXT[start:end] for (start, end) in spans], [original])
+
+
+    def test_whole(self):
+        self.check(TLP(TEXT))
+
+
+    def test_appended(self):
+        # cut inside every defanged form
+        cuts = sorted(set([i + k for i in range(len(TEXT)) if TEXT[i] in u'[{(' or TEXT.startswith(u'hxxp', i) or TEXT.startswith(u'hXXp', i)
+                           for k in (1, 2)]))
+        pieces = [TEXT[a:b] for (a, b) in zip([0] + cuts, cuts + [len(TEXT)])]
+        tlp = TLP(pieces[0])
+        tlp.iocs
+        for piece in pieces[1:]:
+            tlp.append(piece)
+            tlp.iocs
+        self.assertEqual(tlp.iocs, TLP(TEXT).iocs)
+        self.check(tlp)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+import io
+import unittest
+
+from tlp import TLP
+from tlp.tlp_stream import stream_iocs
+
+TEXT = (u'Der Angreifer – laut Bericht – nutzte evil-domain[.]com und 10.0.0[.]1 für die Steuerung. '
+        u'Résumé: hxxps://bad-host[.]example[.]org/päth/x.php lieferte d41d8cd98f00b204e9800998ecf8427e aus, '
+        u'danach kontaktierte es second-stage[dot]example[.]net über CVE-2017-0144. ') * 20
+
+
+def found(iocs):
+    return set((name, ioc) for name in iocs for ioc in iocs[name])
+
+
+class StreamTest(unittest.TestCase):
+
+    def test_small_chunks(self):
+        # bytes cut mid-character, defangs cut mid-'[.]' and iocs cut across chunks
+        expected = found(TLP(TEXT).iocs)
+        raw = TEXT.encode('utf8')
+        for size in (1, 2, 3, 7, 64):
+            self.assertEqual(set(stream_iocs(io.BytesIO(raw), chunk_size=size, overlap=64)), expected, 'chunk size %d' % size)
+
+
+    def test_unicode_chunks(self):
+
+        expected = found(TLP(TEXT).iocs)
+        for size in (5, 100):
+            chunks = [TEXT[i:i + size] for i in range(0, len(TEXT), size)]
+            self.assertEqual(set(stream_iocs(chunks)), expected)
+
+
+    def test_not_unique(self):
+
+        iocs = list(stream_iocs(io.BytesIO(TEXT.encode('utf8')), chunk_size=16, unique=False))
+        self.assertEqual(iocs.count(('domain', u'evil-domain.com')), 20)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+__author__ = "{ ministry of promise }"
+__copyright__ = "Copyright 2015, { ministry of promise }"
+__license__ = "MIT"
+__version__ = "0.1.0"
+__maintainer__ = "Adam Nichols"
+__email__ = "adam.j.nichols@gmail.com"
+__status__ = "Development"
+
+import math,struct,hashlib
+
+
+class BloomFilter:
+    '''
+    fixed-size probabilistic set of strings, sized for capacity entries at the given
+    false positive rate.
+
+    membership never misses an added string, but answers True for a string that was
+    never added with probability about error_rate.  at the default rate of 0.1% that
+    costs under 2 bytes per entry, against roughly 100 for a unicode object in a set.
+    '''
+
+    def __init__(self, capacity, error_rate=0.001):
+
+        try:
+            if capacity < 1:
+                raise ValueError('capacity must be at least 1')
+            if not 0 < error_rate < 1:
+                raise ValueError('error_rate must be in (0, 1)')
+
+            self.capacity = capacity
+            self.error_rate = error_rate
+            self.num_bits = int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+            self.num_hashes = max(1, int(round(self.num_bits * math.log(2) / capacity)))
+            self._bits = bytearray((self.num_bits + 7) / 8)
+            self._count = 0
+
+        except Exception as e:
+            raise e
+
+
+    def _positions(self, item):
+        '''bit positions for item, by double hashing two halves of its md5'''
+
+        if type(item) is unicode:
+            item = item.encode('utf8')
+        (h1, h2) = struct.unpack('<QQ', hashlib.md5(item).digest())
+        return [(h1 + i * h2) % self.num_bits for i in xrange(self.num_hashes)]
+
+
+    def add(self, item):
+
+        try:
+            bits = self._bits
+            new = False
+            for pos in self._positions(item):
+                mask = 1 << (pos & 7)
+                if not bits[pos >> 3] & mask:
+                    bits[pos >> 3] |= mask
+                    new = True
+            if new:
+                self._count += 1
+
+        except Exception as e:
+            raise e
+
+
+    def update(self, items):
+
+        for item in items:
+            self.add(item)
+
+
+    def __contains__(self, item):
+
+        bits = self._bits
+        for pos in self._positions(item):
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+
+    def __len__(self):
+        '''approximate number of distinct items added'''
+        return self._count
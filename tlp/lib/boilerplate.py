@@ -0,0 +1,162 @@
+__author__ = "{ ministry of promise }"
+__copyright__ = "Copyright 2015, { ministry of promise }"
+__license__ = "MIT"
+__version__ = "0.1.0"
+__maintainer__ = "Adam Nichols"
+__email__ = "adam.j.nichols@gmail.com"
+__status__ = "Development"
+
+import os,re,struct,hashlib,threading,tempfile
+import cPickle as pickle
+
+FORMAT_VERSION = 1
+
+# the numbers that change between otherwise identical boilerplate lines - page
+# numbers, dates, copyright years.  only these are folded; any other digits are
+# content (sample names, versions, addresses) and must still tell lines apart
+
+_MONTH = r'(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?'
+FOLDED = re.compile('|'.join([
+    r'^[\W_]*(?:page\s*)?[0-9]+(?:\s*(?:of|/)\s*[0-9]+)?[\W_]*$',
+    r'\bpage\s*[0-9]+(?:\s*(?:of|/)\s*[0-9]+)?\b',
+    r'(?<![0-9.])(?:[0-9]{4}(?P<sep>[-/.])[0-9]{1,2}(?P=sep)[0-9]{1,2}|[0-9]{1,2}(?P<sep2>[-/.])[0-9]{1,2}(?P=sep2)[0-9]{4}'
+    r'|[0-9]{1,2}/[0-9]{1,2}/[0-9]{2})(?![0-9]|\.[0-9])',
+    r'\b' + _MONTH + r'\s+[0-9]{1,2}(?:st|nd|rd|th)?,?\s+[0-9]{4}\b',
+    r'\b[0-9]{1,2}(?:st|nd|rd|th)?\s+' + _MONTH + r',?\s+[0-9]{4}\b',
+    r'(?:\(c\)|\xa9|copyright)\s*[0-9]{4}(?:\s*[-,]\s*[0-9]{4})?',
+]), re.UNICODE)
+
+
+class BoilerplateStore:
+    '''
+    on-disk store of hashed line fingerprints, counted per source (vendor, feed, ...).
+
+    every document from a source adds one to the count of each distinct line it
+    contains.  once a line has been seen in min_count documents from the same source
+    it is boilerplate - headers, footers, legal notices, toc entries - and can be
+    dropped with a single hash lookup, even from documents too short to show the
+    repetition themselves.  page numbers, dates and copyright years are folded
+    before hashing, so 'page 3 of 40' and 'page 4 of 40' share a fingerprint.
+
+    the store holds at most max_entries fingerprints; past that, the least frequent
+    are evicted.  call save() to persist it.
+    '''
+
+    def __init__(self, path=None, max_entries=1000000, min_count=3):
+
+        try:
+            if max_entries < 1:
+                raise ValueError('max_entries must be at least 1')
+
+            self.path = path
+            self.max_entries = max_entries
+            self.min_count = min_count
+            self._sources = dict()
+            self._size = 0
+            self._lock = threading.Lock()
+
+            if path is not None and os.path.exists(path):
+                self.load(path)
+
+        except Exception as e:
+            raise e
+
+
+    @staticmethod
+    def fingerprint(line):
+        '''returns a 64-bit hash of a line, with case, whitespace, page numbers and dates folded'''
+
+        line = re.sub(r'\s+', ' ', line.strip().lower())
+        line = FOLDED.sub(u'0', line)
+        return struct.unpack('<q', hashlib.md5(line.encode('utf8')).digest()[:8])[0]
+
+
+    def count(self, line, source=None, seen=None):
+        '''
+        returns the number of documents from source that contained line.  seen is the
+        set of fingerprints already learned from the current document, which is left out
+        '''
+
+        fp = self.fingerprint(line)
+        count = self._sources.get(source, {}).get(fp, 0)
+        if seen is not None and fp in seen:
+            count -= 1
+        return count
+
+
+    def is_boilerplate(self, line, source=None, seen=None):
+        return self.count(line, source, seen) >= self.min_count
+
+
+    def learn(self, lines, source=None, seen=None):
+        '''
+        records the lines of one document against source.  a document learned in
+        pieces passes the same seen set each time, so each line still counts once
+        '''
+
+        try:
+            fingerprints = set([self.fingerprint(line) for line in lines if len(line.strip()) > 0])
+            if seen is not None:
+                fingerprints -= seen
+                seen |= fingerprints
+            with self._lock:
+                counts = self._sources.setdefault(source, dict())
+                for fp in fingerprints:
+                    if fp not in counts:
+                        self._size += 1
+                    counts[fp] = counts.get(fp, 0) + 1
+                if self._size > self.max_entries:
+                    self._evict()
+
+        except Exception as e:
+            raise e
+
+
+    def _evict(self):
+        '''drops the least frequent fingerprints, down to 90% of max_entries'''
+
+        entries = [(count, source, fp) for (source, counts) in self._sources.iteritems() for (fp, count) in counts.iteritems()]
+        entries.sort()
+        for (count, source, fp) in entries[:len(entries) - int(self.max_entries * .9)]:
+            del self._sources[source][fp]
+            self._size -= 1
+
+
+    def load(self, path):
+
+        try:
+            with open(path, 'rb') as f:
+                (version, sources) = pickle.load(f)
+            if version != FORMAT_VERSION:
+                raise ValueError('unsupported boilerplate store version: %s' % version)
+            with self._lock:
+                self._sources = sources
+                self._size = sum([len(counts) for counts in sources.itervalues()])
+                if self._size > self.max_entries:
+                    self._evict()
+
+        except Exception as e:
+            raise e
+
+
+    def save(self, path=None):
+        '''writes the store atomically, to path or the path it was opened with'''
+
+        try:
+            path = path if path is not None else self.path
+            if path is None:
+                raise ValueError('no path supplied')
+
+            directory = os.path.dirname(os.path.abspath(path))
+            (fd, tmp_path) = tempfile.mkstemp(dir=directory, prefix='.boilerplate')
+            with self._lock:
+                with os.fdopen(fd, 'wb') as f:
+                    pickle.dump((FORMAT_VERSION, self._sources), f, pickle.HIGHEST_PROTOCOL)
+            os.rename(tmp_path, path)
+
+        except Exception as e:
+            raise e
+
+
+    def __len__(self):
+        return self._size
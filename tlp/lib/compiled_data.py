@@ -0,0 +1,100 @@
+__author__ = "{ ministry of promise }"
+__copyright__ = "Copyright 2015, { ministry of promise }"
+__license__ = "MIT"
+__version__ = "0.1.0"
+__maintainer__ = "Adam Nichols"
+__email__ = "adam.j.nichols@gmail.com"
+__status__ = "Development"
+
+import os,sys,marshal,hashlib,tempfile
+from public_suffix import PSL_PATH
+
+# the filter tables (suffix index keys, public suffix trie, keyword filterlist and
+# stopword sets) are compiled from their sources by build() into one marshal file,
+# which a worker loads with a single read instead of parsing the sources.  the
+# artifact records a digest of its sources and is ignored once they change, or when
+# it was written by a different python (marshal's format is version specific)
+
+FORMAT_VERSION = 1
+
+LIB_DIR = os.path.dirname(os.path.abspath(__file__))
+ARTIFACT_PATH = os.path.join(LIB_DIR, 'filter_data.bin')
+SOURCES = [os.path.join(LIB_DIR, 'filter_list.py'), PSL_PATH]
+
+
+def _python():
+    return '%d.%d/%d' % (sys.version_info[0], sys.version_info[1], marshal.version)
+
+
+def file_digest(paths):
+    '''returns a sha1 over the contents of paths, or None if any is missing'''
+
+    digest = hashlib.sha1()
+    for path in paths:
+        try:
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+        except IOError:
+            return None
+    return digest.hexdigest()
+
+
+def build(path=ARTIFACT_PATH):
+    '''compiles the filter tables from source and writes them, atomically, to path'''
+
+    try:
+        from filter_list import keyword_filterlist, ioc_filterlist, alexa_filterlist
+        from public_suffix import PublicSuffixList
+        from suffix_index import SuffixIndex
+
+        tables = dict({
+            'format': FORMAT_VERSION,
+            'python': _python(),
+            'sources': file_digest(SOURCES),
+            'domain_filterlist': list(SuffixIndex(alexa_filterlist + ioc_filterlist['domain']).keys()),
+            'public_suffixes': PublicSuffixList.from_file().trie(),
+            'keyword_filterlist': frozenset(keyword_filterlist)
+        })
+
+        # stopwords come from the nltk corpus, if it's installed where the build runs
+        try:
+            import nltk
+            from nltk.corpus import stopwords
+            source = unicode(nltk.data.find('corpora/stopwords/english'))
+            if file_digest([source]) is not None:
+                tables['stopwords'] = frozenset(stopwords.words('english'))
+                tables['stopwords_source'] = (source, file_digest([source]))
+        except (ImportError, LookupError):
+            pass
+
+        directory = os.path.dirname(os.path.abspath(path))
+        (fd, tmp_path) = tempfile.mkstemp(dir=directory, prefix='.filter_data')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(marshal.dumps(tables))
+        os.rename(tmp_path, path)
+        return path
+
+    except Exception as e:
+        raise e
+
+
+def load(path=ARTIFACT_PATH):
+    '''returns the compiled tables from path, or None if it is missing or stale'''
+
+    try:
+        with open(path, 'rb') as f:
+            tables = marshal.loads(f.read())
+    except (IOError, EOFError, ValueError, TypeError):
+        return None
+
+    if type(tables) is not dict or tables.get('format') != FORMAT_VERSION or tables.get('python') != _python():
+        return None
+    if tables.get('sources') != file_digest(SOURCES):
+        return None
+
+    # a stale stopword table only costs the stopwords
+    if 'stopwords' in tables:
+        (source, digest) = tables['stopwords_source']
+        if file_digest([source]) != digest:
+            del tables['stopwords']
+    return tables
@@ -0,0 +1,111 @@
+__author__ = "{ ministry of promise }"
+__copyright__ = "Copyright 2015, { ministry of promise }"
+__license__ = "MIT"
+__version__ = "0.1.0"
+__maintainer__ = "Adam Nichols"
+__email__ = "adam.j.nichols@gmail.com"
+__status__ = "Development"
+
+from lazy_import import lazy_import
+
+nltk = lazy_import('nltk')
+textblob = lazy_import('textblob')
+
+
+class Document:
+    '''
+    one tokenization of a text, shared by every pipeline stage that reads it.
+
+    each view is built the first time a stage asks for it, in a single pass, and
+    kept: whitespace tokens (color), punkt sentence spans (summary, text) and the
+    word tokens of those sentences (keywords).  tokens are extended in place when
+    text is appended; sentences and words are rebuilt on next use.
+
+    the cleaning stage (TLPFilter.clean_lines) doesn't read it: it rejoins broken
+    lines before splitting, so its lines are its own, and the ioc scan works on
+    refanged text rather than this one.
+    '''
+
+    def __init__(self, text=u''):
+
+        try:
+            if not (type(text) is unicode or type(text) is str):
+                raise TypeError('supplied text object of type that is not str or unicode')
+
+            self.text = text
+            self._tokens = None
+            self._sentence_spans = None
+            self._sentences = None
+            self._words = None
+
+        except Exception as e:
+            raise e
+
+
+    def ends_in_token(self):
+        '''True if the text ends inside a token, which more text could continue'''
+        return len(self.text) > 0 and not self.text[-1].isspace()
+
+
+    def append(self, text):
+
+        try:
+            open_token = self.ends_in_token()
+            self.text += text
+
+            if self._tokens is not None:
+                last = self._tokens.pop() if open_token and len(self._tokens) > 0 else u''
+                self._tokens.extend((last + text).split())
+
+            self._sentence_spans = None
+            self._sentences = None
+            self._words = None
+
+        except Exception as e:
+            raise e
+
+
+    @property
+    def tokens(self):
+        '''the whitespace-delimited tokens of the text'''
+
+        if self._tokens is None:
+            self._tokens = self.text.split()
+        return self._tokens
+
+
+    @property
+    def sentence_spans(self):
+        '''(start, end) of each sentence, as split by nltk's punkt tokenizer'''
+
+        if self._sentence_spans is None:
+            tokenizer = nltk.data.load('tokenizers/punkt/english.pickle')
+            self._sentence_spans = list(tokenizer.span_tokenize(self.text))
+        return self._sentence_spans
+
+
+    @property
+    def sentences(self):
+        '''the sentences of the text, as TextBlob sentences'''
+
+        if self._sentences is None:
+            self._sentences = [textblob.Sentence(self.text[start:end], start_index=start, end_index=end - 1)
+                               for (start, end) in self.sentence_spans]
+        return self._sentences
+
+
+    @property
+    def words(self):
+        '''word tokens of each sentence in turn, less punctuation - the same as TextBlob.words'''
+
+        if self._words is None:
+            tokenizer = textblob.tokenizers.WordTokenizer()
+            words = list()
+            for (start, end) in self.sentence_spans:
+                words.extend(tokenizer.tokenize(self.text[start:end], include_punc=False))
+            self._words = textblob.WordList(words)
+        return self._words
+
+
+    def __len__(self):
+        return len(self.text)
@@ -0,0 +1,53 @@
+__author__ = "{ ministry of promise }"
+__copyright__ = "Copyright 2015, { ministry of promise }"
+__license__ = "MIT"
+__version__ = "0.1.0"
+__maintainer__ = "Adam Nichols"
+__email__ = "adam.j.nichols@gmail.com"
+__status__ = "Development"
+
+
+def edit_distance(a, b, limit=None):
+    '''
+    levenshtein distance between a and b, using myers' bit-parallel algorithm over
+    python ints - one row of the edit matrix per character of a, held as bit vectors
+    the length of b.  with limit, returns early with some value >= limit once the
+    distance can no longer come in under it.
+    '''
+
+    if len(b) > len(a):
+        (a, b) = (b, a)
+    (n, m) = (len(a), len(b))
+    if m == 0:
+        return n
+    if limit is not None and n - m >= limit:
+        return n - m
+
+    # bit i of peq[c] is set where b[i] == c
+    peq = dict()
+    for (i, c) in enumerate(b):
+        peq[c] = peq.get(c, 0) | (1 << i)
+
+    mask = (1 << m) - 1
+    last = 1 << (m - 1)
+    (pv, mv, score) = (mask, 0, m)
+
+    for (j, c) in enumerate(a):
+        eq = peq.get(c, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | ~(xh | pv)
+        mh = pv & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        # each remaining character of a can lower the score by at most one
+        if limit is not None and score - (n - j - 1) >= limit:
+            return score - (n - j - 1)
+        ph = (ph << 1) | 1
+        mh = mh << 1
+        pv = (mh | ~(xv | ph)) & mask
+        mv = ph & xv
+
+    return score
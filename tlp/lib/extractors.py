@@ -0,0 +1,303 @@
+__author__ = "{ ministry of promise }"
+__copyright__ = "Copyright 2015, { ministry of promise }"
+__license__ = "MIT"
+__version__ = "0.1.0"
+__maintainer__ = "Adam Nichols"
+__email__ = "adam.j.nichols@gmail.com"
+__status__ = "Development"
+
+import re,hashlib,threading
+from lru_cache import LRUCache
+from regex_list import scan_patterns, ipv4_pattern, domain_pattern
+
+# every extractor's matches start where the preceding character isn't a word
+# character, so the combined scanner rules out most offsets with one cheap check
+# before trying any of the alternatives
+
+WORD_START = r'(?<![0-9a-zA-Z_])'
+
+ipv4 = re.compile(ipv4_pattern + '$')
+domain = re.compile(domain_pattern + '$')
+url_host = re.compile(r'[a-z]+://(?:[^/?#@\s]*@)?([^/?#:\s]+)', re.I)
+
+
+class Extractor:
+    '''
+    one type of ioc found by the scanner.
+
+    pattern is an unanchored regex for candidates, starting with a lookbehind at
+    least as strict as WORD_START.  prefilter is a literal string (or compiled regex)
+    that occurs in every candidate, so any text lacking it skips the pattern
+    altogether - it's a speedup, never a filter.  validator takes a candidate and
+    returns False to drop it, and derive returns (type, offset, ioc) for any other
+    iocs contained in a match, such as the host of a url.
+    '''
+
+    def __init__(self, name, pattern, prefilter=None, validator=None, derive=None):
+
+        try:
+            if not re.match(r'^[a-z_][a-z0-9_]*$', name):
+                raise ValueError('extractor names must be lowercase identifiers')
+            re.compile(pattern)
+
+            self.name = name
+            self.pattern = pattern
+            self.prefilter = prefilter
+            self.validator = validator
+            self.derive = derive
+
+        except Exception as e:
+            raise e
+
+
+    def active(self, text):
+        '''returns False if text can't contain a match'''
+
+        if self.prefilter is None:
+            return True
+        if isinstance(self.prefilter, basestring):
+            return self.prefilter in text
+        return self.prefilter.search(text) is not None
+
+
+    def signature(self):
+        '''everything about this extractor that can change its results'''
+
+        # a compiled prefilter's repr holds its address, which differs from process to process
+        prefilter = self.prefilter
+        if not (prefilter is None or isinstance(prefilter, basestring)):
+            prefilter = (prefilter.pattern, prefilter.flags)
+        return (self.name, self.pattern, repr(prefilter),
+                getattr(self.validator, '__name__', None), getattr(self.derive, '__name__', None))
+
+
+class ExtractorRegistry:
+    '''
+    ordered set of extractors, compiled into a single regex alternation.  the
+    scanner for each text only includes the extractors whose prefilter it passes,
+    and compiled scanners are cached by that combination.  a filter freezes the
+    registry it is given, since a change would reach every filter sharing it
+    '''
+
+    def __init__(self, extractors=None):
+
+        try:
+            self._extractors = []
+            self._scanners = LRUCache(64)
+            self._lock = threading.Lock()
+            self._frozen = False
+            if extractors is not None:
+                for extractor in extractors:
+                    self.register(extractor)
+
+        except Exception as e:
+            raise e
+
+
+    def register(self, extractor, before=None):
+        '''
+        adds an extractor, replacing any of the same name.  it is tried after the
+        existing extractors, or ahead of the one named before
+        '''
+
+        try:
+            with self._lock:
+                self._check_frozen()
+                extractors = [e for e in self._extractors if e.name != extractor.name]
+                if before is None:
+                    extractors.append(extractor)
+                else:
+                    names = [e.name for e in extractors]
+                    if before not in names:
+                        raise ValueError('no extractor named %s' % before)
+                    extractors.insert(names.index(before), extractor)
+                self._extractors = extractors
+                self._scanners.clear()
+
+        except Exception as e:
+            raise e
+
+
+    def unregister(self, name):
+
+        with self._lock:
+            self._check_frozen()
+            self._extractors = [e for e in self._extractors if e.name != name]
+            self._scanners.clear()
+
+
+    def freeze(self):
+        '''stops the registry from changing from here on, returning it'''
+
+        with self._lock:
+            self._frozen = True
+        return self
+
+
+    @property
+    def frozen(self):
+        return self._frozen
+
+
+    def _check_frozen(self):
+
+        if self._frozen:
+            raise ValueError('extractor registry is frozen - start a new one from default_extractors() to change it')
+
+
+    @property
+    def names(self):
+        return [e.name for e in self._extractors]
+
+
+    def get(self, name):
+
+        for extractor in self._extractors:
+            if extractor.name == name:
+                return extractor
+        return None
+
+
+    def fingerprint(self):
+        return hashlib.sha1(repr([e.signature() for e in self._extractors])).hexdigest()
+
+
+    def scanner(self, text):
+        '''returns the compiled scanner for the extractors text passes the prefilter of'''
+
+        extractors = [e for e in self._extractors if e.active(text)]
+        key = tuple([e.name for e in extractors])
+        scanner = self._scanners.get(key)
+        if scanner is None:
+            if len(extractors) == 0:
+                scanner = re.compile(r'(?!)')
+            else:
+                scanner = re.compile(WORD_START + '(?:%s)' % '|'.join(['(?P<%s>%s)' % (e.name, e.pattern) for e in extractors]), re.I)
+            self._scanners.set(key, scanner)
+        return scanner
+
+
+    def scan(self, text, pos=0):
+        '''yields (type, start, end, value) for every ioc in text from pos, in a single pass'''
+
+        extractors = dict((e.name, e) for e in self._extractors)
+        for m in self.scanner(text).finditer(text, pos):
+            extractor = extractors[m.lastgroup]
+            value = m.group()
+            if extractor.validator is not None and not extractor.validator(value):
+                continue
+            yield (extractor.name, m.start(), m.end(), value)
+            if extractor.derive is not None:
+                for (name, offset, derived) in extractor.derive(value):
+                    yield (name, m.start() + offset, m.start() + offset + len(derived), derived)
+
+
+    def __contains__(self, name):
+        return name in self.names
+
+
+    def __len__(self):
+        return len(self._extractors)
+
+
+'''
+validators and derivations for the default extractors
+'''
+
+def valid_ssdeep(value):
+    '''block sizes are always 3 * 2^n'''
+
+    blocksize = int(value.split(':', 1)[0])
+    return blocksize >= 3 and blocksize % 3 == 0 and (blocksize / 3) & (blocksize / 3 - 1) == 0
+
+
+def valid_ipv6(value):
+
+    if value.count('::') > 1:
+        return False
+    if '::' in value:
+        (head, tail) = value.split('::')
+        groups = (head.split(':') if head else []) + (tail.split(':') if tail else [])
+        if len(groups) > 7:
+            return False
+    else:
+        groups = value.split(':')
+        if len(groups) != 8:
+            return False
+    # a lone '::1' or '::' is more often punctuation than an address worth reporting
+    return len(groups) >= 2 and all([0 < len(g) <= 4 for g in groups])
+
+
+BASE58 = '123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz'
+BECH32 = 'qpzry9x8gf2tvdw0s3jn54khce6mua7l'
+
+
+def valid_bitcoin(value):
+    '''checks the base58check or bech32 checksum of a bitcoin address'''
+
+    value = str(value)
+    if value.lower().startswith('bc1'):
+        value = value.lower()
+        values = [ord(c) >> 5 for c in 'bc'] + [0] + [ord(c) & 31 for c in 'bc'] + [BECH32.index(c) for c in value[3:]]
+        chk = 1
+        for v in values:
+            top = chk >> 25
+            chk = (chk & 0x1ffffff) << 5 ^ v
+            for (i, g) in enumerate((0x3b6a57b2, 0x26508e6d, 0x1ea119fa, 0x3d4233dd, 0x2a1462b3)):
+                chk ^= g if ((top >> i) & 1) else 0
+        return chk in (1, 0x2bc830a3)
+
+    n = 0
+    for c in value:
+        if c not in BASE58:
+            return False
+        n = n * 58 + BASE58.index(c)
+    # 35 base58 digits can hold more than the 25 bytes of an address
+    if n >= 256 ** 25:
+        return False
+    raw = ('%050x' % n).decode('hex')
+    return hashlib.sha256(hashlib.sha256(raw[:-4]).digest()).digest()[:4] == raw[-4:]
+
+
+def host_of_url(value):
+    '''the host of a url, as a domain or an ip'''
+
+    m = url_host.match(value)
+    if m is None:
+        return []
+    host = m.group(1)
+    if ipv4.match(host):
+        return [('ip', m.start(1), host)]
+    if domain.match(host):
+        return [('domain', m.start(1), host)]
+    return []
+
+
+def domain_of_email(value):
+
+    at = value.rindex('@') + 1
+    return [('domain', at, value[at:])]
+
+
+default_extractor_options = {
+
+    'ssdeep': dict(prefilter=':', validator=valid_ssdeep),
+    'cidr': dict(prefilter='/'),
+    'ipv6': dict(prefilter=':', validator=valid_ipv6),
+    'url': dict(prefilter='://', derive=host_of_url),
+    'email': dict(prefilter='@', derive=domain_of_email),
+    'cve': dict(prefilter=re.compile('cve', re.I)),
+    'bitcoin': dict(validator=valid_bitcoin),
+    'registry': dict(prefilter='\\'),
+    'filepath': dict(prefilter='\\'),
+    'ip': dict(prefilter='.'),
+    'domain': dict(prefilter='.')
+
+}
+
+
+def default_extractors():
+    '''returns a new registry of the built-in extractors, in scan_patterns order'''
+
+    return ExtractorRegistry([Extractor(name, pattern, **default_extractor_options.get(name, {}))
+                              for (name, pattern) in scan_patterns])
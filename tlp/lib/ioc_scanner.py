@@ -0,0 +1,79 @@
+__author__ = "{ ministry of promise }"
+__copyright__ = "Copyright 2015, { ministry of promise }"
+__license__ = "MIT"
+__version__ = "0.1.0"
+__maintainer__ = "Adam Nichols"
+__email__ = "adam.j.nichols@gmail.com"
+__status__ = "Development"
+
+
+class IOCScanner:
+    '''
+    scans text that arrives a piece at a time for iocs, holding no more than the
+    last overlap characters between pieces.  TLP.append and stream_iocs both use it.
+
+    each piece is refanged with the filter and scanned on the end of the tail of the
+    last.  iocs that end before the last overlap characters are settled.  the rest
+    are provisional: the tail is scanned again with the next piece in case they
+    continue into it, and they are found again then.  a defanged form the next piece
+    could complete is held back raw, and only scanned provisionally.
+
+    an ioc longer than overlap that reaches into the tail can't be held back, so it
+    is settled as it stands, with anything derived from it - one that runs on into
+    the next piece is cut short where its piece ended.
+    '''
+
+    def __init__(self, tlpfilter, overlap=1024):
+
+        try:
+            if overlap < 1:
+                raise ValueError('overlap must be at least 1')
+
+            self.tlpfilter = tlpfilter
+            self.overlap = overlap
+            self._tail = u''
+            self._pending = u''
+            self._context = 0
+
+        except Exception as e:
+            raise e
+
+
+    def feed(self, text, final=False):
+        '''
+        scans the next piece of text, returning (settled, provisional, scanned): two
+        lists of (type, ioc), and the number of characters scanned.  with final there
+        is no next piece, and everything found is settled.
+        '''
+
+        try:
+            pending = self._pending + text
+            settled_text = u''
+            if len(pending) > 0:
+                (settled_text, offsets, consumed) = self.tlpfilter.refang(pending, final=final)
+                self._pending = pending[consumed:]
+            provisional_text = self.tlpfilter.normalize(self._pending) if len(self._pending) > 0 else u''
+            data = self._tail + settled_text + provisional_text
+            settled_end = len(data) - len(provisional_text)
+
+            cut = len(data) - self.overlap
+            keep = len(data) if final else None
+            (settled, provisional) = (list(), list())
+            for (name, start, end, ioc) in self.tlpfilter.extractors.scan(data, self._context):
+                if keep is None and end >= cut:
+                    keep = min(start if start >= cut - self.overlap else cut, settled_end)
+                if keep is not None and start >= keep:
+                    provisional.append((name, ioc))
+                else:
+                    settled.append((name, ioc))
+            scanned = len(data) - self._context
+            if keep is None:
+                keep = min(max(cut, self._context), settled_end)
+
+            # hold on to one character before the tail, for the scanner's lookbehinds
+            self._context = 1 if keep > 0 else 0
+            self._tail = data[keep - self._context:settled_end]
+            return (settled, provisional, scanned)
+
+        except Exception as e:
+            raise e
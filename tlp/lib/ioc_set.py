@@ -0,0 +1,240 @@
+__author__ = "{ ministry of promise }"
+__copyright__ = "Copyright 2015, { ministry of promise }"
+__license__ = "MIT"
+__version__ = "0.1.0"
+__maintainer__ = "Adam Nichols"
+__email__ = "adam.j.nichols@gmail.com"
+__status__ = "Development"
+
+import binascii
+from array import array
+
+# raw digest length, in bytes, of each hash ioc type
+
+DIGEST_BYTES = {'md5': 16, 'sha1': 20, 'sha256': 32, 'sha512': 64}
+
+
+def _pack_ip(ioc):
+
+    parts = ioc.split('.')
+    if len(parts) != 4:
+        return None
+    n = 0
+    for part in parts:
+        if not part.isdigit() or int(part) > 255:
+            return None
+        n = (n << 8) | int(part)
+    return n
+
+
+def _unpack_ip(n):
+    return u'%d.%d.%d.%d' % (n >> 24, (n >> 16) & 255, (n >> 8) & 255, n & 255)
+
+
+def _pack_digest(ioc, width):
+
+    try:
+        digest = binascii.unhexlify(ioc)
+    except (TypeError, ValueError, UnicodeError):
+        return None
+    if len(digest) != width:
+        return None
+    return digest
+
+
+def _pack_text(ioc):
+
+    # ascii iocs are kept as interned byte strings - a fraction of the size of a unicode
+    # object, and shared by every set in the process holding the same ioc
+    try:
+        return intern(ioc.encode('ascii'))
+    except UnicodeError:
+        return ioc
+
+
+class IOCSet(object):
+    '''
+    immutable, compact set of iocs of a single type.
+
+    ips are held as sorted 32-bit integers in an array, md5/sha1/sha256/sha512 as
+    one string of sorted raw digests, and everything else (domains, cves, ...) as a
+    sorted tuple of interned strings.  membership is a binary search, iteration yields
+    unicode in sorted order (hashes as lowercase hex), and sets pickle as their
+    packed form.
+    '''
+
+    __slots__ = ('kind', '_data')
+
+    def __init__(self, kind, iocs=()):
+
+        try:
+            keys = set()
+            for ioc in iocs:
+                key = self._pack(kind, ioc)
+                if key is None:
+                    raise ValueError('invalid %s ioc: %r' % (kind, ioc))
+                keys.add(key)
+            self.kind = kind
+            self._data = self._store(kind, sorted(keys))
+
+        except Exception as e:
+            raise e
+
+
+    @classmethod
+    def _from_keys(cls, kind, keys):
+        '''builds a set straight from sorted, unique packed keys'''
+
+        iocs = cls.__new__(cls)
+        iocs.kind = kind
+        iocs._data = cls._store(kind, keys)
+        return iocs
+
+
+    @staticmethod
+    def _pack(kind, ioc):
+        '''returns the packed key for ioc, or None if it isn't a valid ioc of this kind'''
+
+        if not isinstance(ioc, basestring):
+            return None
+        if kind == 'ip':
+            return _pack_ip(ioc)
+        if kind in DIGEST_BYTES:
+            return _pack_digest(ioc, DIGEST_BYTES[kind])
+        return _pack_text(ioc)
+
+
+    @staticmethod
+    def _store(kind, keys):
+
+        if kind == 'ip':
+            return array('I', keys)
+        if kind in DIGEST_BYTES:
+            return ''.join(keys)
+        return tuple(keys)
+
+
+    def _unpack(self, key):
+
+        if self.kind == 'ip':
+            return _unpack_ip(key)
+        if self.kind in DIGEST_BYTES:
+            return binascii.hexlify(key).decode('ascii')
+        return unicode(key)
+
+
+    def _key(self, i):
+
+        if self.kind in DIGEST_BYTES:
+            width = DIGEST_BYTES[self.kind]
+            return self._data[i * width:(i + 1) * width]
+        return self._data[i]
+
+
+    def _keys(self):
+        return (self._key(i) for i in xrange(len(self)))
+
+
+    def __len__(self):
+
+        if self.kind in DIGEST_BYTES:
+            return len(self._data) / DIGEST_BYTES[self.kind]
+        return len(self._data)
+
+
+    def __iter__(self):
+        return (self._unpack(key) for key in self._keys())
+
+
+    def __contains__(self, ioc):
+
+        key = self._pack(self.kind, ioc)
+        if key is None:
+            return False
+        (lo, hi) = (0, len(self))
+        while lo < hi:
+            mid = (lo + hi) / 2
+            if self._key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo < len(self) and self._key(lo) == key
+
+
+    def _coerce(self, other):
+
+        if isinstance(other, IOCSet):
+            if other.kind != self.kind:
+                raise TypeError('cannot combine %s and %s iocs' % (self.kind, other.kind))
+            return other
+        return IOCSet(self.kind, other)
+
+
+    def union(self, *others):
+
+        keys = set(self._keys())
+        for other in others:
+            keys.update(self._coerce(other)._keys())
+        return self._from_keys(self.kind, sorted(keys))
+
+
+    def intersection(self, *others):
+
+        keys = set(self._keys())
+        for other in others:
+            keys.intersection_update(self._coerce(other)._keys())
+        return self._from_keys(self.kind, sorted(keys))
+
+
+    def difference(self, *others):
+
+        keys = set(self._keys())
+        for other in others:
+            keys.difference_update(self._coerce(other)._keys())
+        return self._from_keys(self.kind, sorted(keys))
+
+
+    __or__ = __ror__ = union
+    __and__ = __rand__ = intersection
+    __sub__ = difference
+
+
+    def __eq__(self, other):
+
+        if isinstance(other, IOCSet):
+            return self.kind == other.kind and self._data == other._data
+        if isinstance(other, (set, frozenset)):
+            # packed the way __contains__ packs, so 'D41D...' matches as it does there
+            keys = set(self._pack(self.kind, ioc) for ioc in other)
+            return None not in keys and keys == set(self._keys())
+        return NotImplemented
+
+
+    def __ne__(self, other):
+
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    __hash__ = None
+
+
+    def __getstate__(self):
+
+        data = self._data.tostring() if self.kind == 'ip' else self._data
+        return (self.kind, data)
+
+
+    def __setstate__(self, state):
+
+        (self.kind, data) = state
+        if self.kind == 'ip':
+            self._data = array('I')
+            self._data.fromstring(data)
+        elif self.kind in DIGEST_BYTES:
+            self._data = data
+        else:
+            self._data = tuple([intern(key) if type(key) is str else key for key in data])
+
+
+    def __repr__(self):
+        return 'IOCSet(%r, %r)' % (self.kind, list(self))
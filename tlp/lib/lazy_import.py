@@ -0,0 +1,58 @@
+__author__ = "{ ministry of promise }"
+__copyright__ = "Copyright 2015, { ministry of promise }"
+__license__ = "MIT"
+__version__ = "0.1.0"
+__maintainer__ = "Adam Nichols"
+__email__ = "adam.j.nichols@gmail.com"
+__status__ = "Development"
+
+import sys,importlib,threading
+
+# nltk, textblob and numpy take far longer to import than all of tlp, and only the
+# nlp and scoring stages use them, so tlp holds them as stand-ins that import the
+# real module the first time anything is looked up on it
+
+_lock = threading.Lock()
+
+
+class LazyModule(object):
+    '''stands in for a module that is imported on first attribute access'''
+
+    __slots__ = ('_name', '_module')
+
+    def __init__(self, name):
+
+        object.__setattr__(self, '_name', name)
+        object.__setattr__(self, '_module', None)
+
+
+    def _load(self):
+
+        module = object.__getattribute__(self, '_module')
+        if module is None:
+            with _lock:
+                module = object.__getattribute__(self, '_module')
+                if module is None:
+                    module = importlib.import_module(object.__getattribute__(self, '_name'))
+                    object.__setattr__(self, '_module', module)
+        return module
+
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+
+    def __repr__(self):
+
+        name = object.__getattribute__(self, '_name')
+        if name in sys.modules:
+            return repr(sys.modules[name])
+        return '<lazy module %r>' % name
+
+
+def lazy_import(name):
+    '''returns name if it is already imported, otherwise a stand-in that imports it when first used'''
+
+    if name in sys.modules:
+        return sys.modules[name]
+    return LazyModule(name)
@@ -0,0 +1,60 @@
+__author__ = "{ ministry of promise }"
+__copyright__ = "Copyright 2015, { ministry of promise }"
+__license__ = "MIT"
+__version__ = "0.1.0"
+__maintainer__ = "Adam Nichols"
+__email__ = "adam.j.nichols@gmail.com"
+__status__ = "Development"
+
+from collections import OrderedDict
+import threading
+
+
+class LRUCache:
+    '''bounded, thread-safe mapping that evicts the least recently used key'''
+
+    def __init__(self, maxsize=100000):
+
+        try:
+            if maxsize < 1:
+                raise ValueError('cache size must be at least 1')
+            self.maxsize = maxsize
+            self._data = OrderedDict()
+            self._lock = threading.Lock()
+
+        except Exception as e:
+            raise e
+
+
+    def get(self, key, default=None):
+
+        with self._lock:
+            try:
+                value = self._data.pop(key)
+            except KeyError:
+                return default
+            self._data[key] = value
+            return value
+
+
+    def set(self, key, value):
+
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = value
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+
+    def clear(self):
+
+        with self._lock:
+            self._data.clear()
+
+
+    def __contains__(self, key):
+        return key in self._data
+
+
+    def __len__(self):
+        return len(self._data)
@@ -0,0 +1,134 @@
+__author__ = "{ ministry of promise }"
+__copyright__ = "Copyright 2015, { ministry of promise }"
+__license__ = "MIT"
+__version__ = "0.1.0"
+__maintainer__ = "Adam Nichols"
+__email__ = "adam.j.nichols@gmail.com"
+__status__ = "Development"
+
+import numpy as np
+
+# hash permutations are (a * x + b) mod PRIME, with x reduced below PRIME first so
+# that every product fits in 64 bits
+
+PRIME = np.uint64((1 << 31) - 1)
+
+# the chance a string exactly threshold similar to an indexed one must have of sharing
+# a bucket with it.  past that, the fewer buckets the better
+
+RECALL = 0.99
+
+
+class MinHashIndex:
+    '''
+    near-duplicate lookup over short strings, using character shingles, minhash
+    signatures and locality-sensitive hashing.
+
+    each indexed string is bucketed once per signature band, and a query is only
+    compared against the strings it shares a bucket with - candidates are then
+    confirmed by their exact shingle jaccard similarity against threshold, or by
+    the caller's own measure.
+    '''
+
+    def __init__(self, threshold=0.5, num_perm=128, shingle_size=3, seed=1):
+
+        try:
+            if not 0 < threshold <= 1:
+                raise ValueError('threshold must be in (0, 1]')
+
+            self.threshold = threshold
+            self.shingle_size = shingle_size
+
+            # candidates are confirmed against threshold, so the lsh s-curve has to rise
+            # well below it or pairs just over it are missed.  take the most rows per
+            # band (the fewest false candidates) that still finds them RECALL of the time
+            layouts = [(num_perm / r, r) for r in range(1, num_perm + 1) if num_perm % r == 0]
+            (self.bands, self.rows) = max([(b, r) for (b, r) in layouts if 1 - (1 - threshold ** r) ** b >= RECALL] or [layouts[0]],
+                                          key=lambda layout: layout[1])
+
+            rng = np.random.RandomState(seed)
+            self._a = rng.randint(1, int(PRIME), size=self.bands * self.rows).astype(np.uint64)[:, None]
+            self._b = rng.randint(0, int(PRIME), size=self.bands * self.rows).astype(np.uint64)[:, None]
+
+            self._items = []
+            self._shingles = []
+            self._buckets = dict()
+
+        except Exception as e:
+            raise e
+
+
+    def shingles(self, text):
+        '''returns the sorted, unique hashes of every shingle_size character window of text'''
+
+        codes = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32).astype(np.uint64)
+        k = min(self.shingle_size, len(codes))
+        if k == 0:
+            return np.zeros(1, dtype=np.uint64)
+        n = len(codes) - k + 1
+        hashes = np.zeros(n, dtype=np.uint64)
+        for j in range(k):
+            hashes = hashes * np.uint64(1114111) + codes[j:j + n]
+        return np.unique(hashes % PRIME)
+
+
+    def _bands(self, shingles):
+
+        signature = ((self._a * shingles[None, :] + self._b) % PRIME).min(axis=1)
+        for band in range(self.bands):
+            yield (band, signature[band * self.rows:(band + 1) * self.rows].tostring())
+
+
+    def add(self, text):
+
+        try:
+            shingles = self.shingles(text)
+            item = len(self._items)
+            self._items.append(text)
+            self._shingles.append(shingles)
+            for key in self._bands(shingles):
+                self._buckets.setdefault(key, []).append(item)
+
+        except Exception as e:
+            raise e
+
+
+    def _candidates(self, shingles):
+
+        seen = set()
+        for key in self._bands(shingles):
+            for item in self._buckets.get(key, ()):
+                if item not in seen:
+                    seen.add(item)
+                    yield item
+
+
+    def candidates(self, text):
+        '''yields each indexed string that shares a bucket with text, unconfirmed'''
+
+        if len(self._items) > 0:
+            for item in self._candidates(self.shingles(text)):
+                yield self._items[item]
+
+
+    def query(self, text):
+        '''returns an indexed string at least threshold similar to text, or None'''
+
+        try:
+            if len(self._items) == 0:
+                return None
+
+            shingles = self.shingles(text)
+            for item in self._candidates(shingles):
+                other = self._shingles[item]
+                shared = len(np.intersect1d(shingles, other, assume_unique=True))
+                if float(shared) / (len(shingles) + len(other) - shared) >= self.threshold:
+                    return self._items[item]
+            return None
+
+        except Exception as e:
+            raise e
+
+
+    def __len__(self):
+        return len(self._items)
@@ -0,0 +1,162 @@
+__author__ = "{ ministry of promise }"
+__copyright__ = "Copyright 2015, { ministry of promise }"
+__license__ = "MIT"
+__version__ = "0.1.0"
+__maintainer__ = "Adam Nichols"
+__email__ = "adam.j.nichols@gmail.com"
+__status__ = "Development"
+
+import os,codecs,threading
+
+PSL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'effective_tld_names.dat')
+
+_RULE = u'$'
+_EXCEPTION = u'!'
+_WILDCARD = u'*'
+
+_psl = None
+_psl_lock = threading.Lock()
+
+
+class PublicSuffixList:
+    '''
+    label trie built from the mozilla public suffix list, maintained at
+    https://publicsuffix.org/list/effective_tld_names.dat
+
+    rules are stored by reversed label, so 'co.uk' lives at trie['uk']['co'].
+    wildcard ('*.ck') and exception ('!www.ck') rules are supported as
+    described at https://publicsuffix.org/list/
+    '''
+
+    def __init__(self, rules=None):
+
+        try:
+            self._trie = dict()
+            if rules is not None:
+                for rule in rules:
+                    self.add(rule)
+
+        except Exception as e:
+            raise e
+
+
+    @classmethod
+    def from_file(cls, path=PSL_PATH):
+
+        try:
+            psl = cls()
+            with codecs.open(path, 'r', 'utf-8') as f:
+                for line in f:
+                    # rules end at the first whitespace, comments start with //
+                    line = line.strip()
+                    if len(line) == 0 or line.startswith(u'//'):
+                        continue
+                    psl.add(line.split()[0])
+            return psl
+
+        except Exception as e:
+            raise e
+
+
+    @classmethod
+    def from_trie(cls, trie):
+        '''builds a list straight from the label trie of another, see trie()'''
+
+        psl = cls()
+        psl._trie = trie
+        return psl
+
+
+    def trie(self):
+        return self._trie
+
+
+    def add(self, rule):
+
+        try:
+            rule = rule.strip().lower()
+            marker = _RULE
+            if rule.startswith(_EXCEPTION):
+                marker = _EXCEPTION
+                rule = rule[1:]
+
+            labels = rule.split('.')
+            labels.reverse()
+            self._insert(labels, marker)
+
+            # iocs are matched in their ascii form, so index idn rules as punycode too
+            try:
+                ascii_labels = [l if l == _WILDCARD else l.encode('idna').decode('ascii') for l in labels]
+                if ascii_labels != labels:
+                    self._insert(ascii_labels, marker)
+            except UnicodeError:
+                pass
+
+        except Exception as e:
+            raise e
+
+
+    def _insert(self, labels, marker):
+
+        node = self._trie
+        for label in labels:
+            node = node.setdefault(label, dict())
+        node[marker] = True
+
+
+    def _walk(self, node, labels, depth, found):
+        '''collects (depth, is_exception) for every rule matching labels'''
+
+        if depth == len(labels):
+            return
+        for key in (labels[depth], _WILDCARD):
+            child = node.get(key)
+            if child is None:
+                continue
+            if _RULE in child:
+                found.append((depth + 1, False))
+            if _EXCEPTION in child:
+                found.append((depth + 1, True))
+            self._walk(child, labels, depth + 1, found)
+
+
+    def public_suffix(self, domain):
+        '''returns the public suffix of a domain, or None if no rule matches'''
+
+        try:
+            labels = domain.strip().strip('.').lower().split('.')
+            labels.reverse()
+
+            found = []
+            self._walk(self._trie, labels, 0, found)
+            if len(found) == 0:
+                return None
+
+            # an exception rule wins, and its suffix drops the leftmost label
+            exceptions = [depth for (depth, exception) in found if exception]
+            if len(exceptions) > 0:
+                depth = max(exceptions) - 1
+            else:
+                depth = max([depth for (depth, exception) in found])
+
+            suffix = labels[:depth]
+            suffix.reverse()
+            return u'.'.join(suffix)
+
+        except Exception as e:
+            raise e
+
+
+    def __contains__(self, domain):
+        return self.public_suffix(domain) is not None
+
+
+def public_suffix_list():
+    '''returns the process-wide public suffix list, parsing it on first use'''
+
+    global _psl
+    if _psl is None:
+        with _psl_lock:
+            if _psl is None:
+                _psl = PublicSuffixList.from_file()
+    return _psl
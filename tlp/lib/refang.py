@@ -0,0 +1,104 @@
+__author__ = "{ ministry of promise }"
+__copyright__ = "Copyright 2015, { ministry of promise }"
+__license__ = "MIT"
+__version__ = "0.1.0"
+__maintainer__ = "Adam Nichols"
+__email__ = "adam.j.nichols@gmail.com"
+__status__ = "Development"
+
+import re
+from array import array
+from bisect import bisect_right
+
+# defanged forms and what they stand for, longest first at any given offset.  any
+# other square bracket is dropped outright, as the pre-filter always has.  None
+# marks hxxp, which keeps its case: hXXp becomes hTTp
+
+defang_patterns = [
+
+    (r'\[dot\]|\(dot\)|\{dot\}|\[\.\]|\(\.\)|\{\.\}', u'.'),
+    (r'\[://\]', u'://'),
+    (r'\[:\]', u':'),
+    (r'\[@\]|\[at\]', u'@'),
+    (r'h[x]{2}p', None),
+    (r'[\[\]]', u'')
+
+]
+
+# the lookahead lets the scanner skip ahead to the characters a defanged form can start with
+defang_scanner = re.compile(r'(?=[\[\](){}h])(?:%s)' % '|'.join(['(%s)' % pattern for (pattern, replacement) in defang_patterns]), re.I)
+
+# no defanged form is longer than this, so only that many characters at the end of a
+# piece of text can be the start of one that continues into the next
+
+MAX_DEFANG = 5
+
+# characters that split tokens, replaced one for one.  a regex substitution is many
+# times faster than unicode.translate here
+
+whitespace = re.compile(u'[\uFFFC\t\n\r\x0b\x0c]')
+
+
+class OffsetMap:
+    '''
+    maps positions in refanged text back to the text it came from.  only the points
+    where the two drift apart are stored, so the map is tiny unless the text is
+    mostly defanged iocs
+    '''
+
+    def __init__(self):
+
+        self._positions = array('l', [0])
+        self._deltas = array('l', [0])
+
+
+    def add(self, position, original):
+        '''records that position in the refanged text, and everything after it up to the next point, came from original'''
+
+        delta = original - position
+        if delta != self._deltas[-1]:
+            self._positions.append(position)
+            self._deltas.append(delta)
+
+
+    def original(self, position):
+        return position + self._deltas[bisect_right(self._positions, position) - 1]
+
+
+    def span(self, start, end):
+        '''returns the original (start, end) of a refanged slice, leaving out anything dropped around it'''
+
+        if end <= start:
+            return (self.original(start), self.original(start))
+        return (self.original(start), self.original(end - 1) + 1)
+
+
+def refang(text, final=True):
+    '''
+    returns (normalized, offsets, consumed): text with defanged iocs restored and
+    whitespace flattened to spaces, an OffsetMap from normalized back to text, and
+    how many characters of text were used.  unless final, characters at the end that
+    could begin a defanged form are left unconsumed, for the caller to put in front
+    of the next piece of text.  runs in a single pass
+    '''
+
+    limit = len(text) if final else max(0, len(text) - (MAX_DEFANG - 1))
+    offsets = OffsetMap()
+    pieces = []
+    (last, size) = (0, 0)
+    for m in defang_scanner.finditer(text):
+        if m.start() >= limit:
+            break
+        pieces.append(text[last:m.start()])
+        size += m.start() - last
+        replacement = defang_patterns[m.lastindex - 1][1]
+        if replacement is None:
+            replacement = m.group().replace(u'x', u't').replace(u'X', u'T')
+        pieces.append(replacement)
+        size += len(replacement)
+        last = m.end()
+        offsets.add(size, last)
+
+    consumed = max(limit, last)
+    pieces.append(text[last:consumed])
+    return (whitespace.sub(u' ', u''.join(pieces)), offsets, consumed)
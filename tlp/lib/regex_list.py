@@ -18,3 +18,35 @@ regexs = {
     'cve': re.compile(r'cve.+?\d{4}.+?\d{4}.*', re.I)
 
 }
+
+# unanchored forms of the patterns above, plus the types only found by scanning,
+# compiled into a single scanner by lib.extractors.  order matters: at any given
+# offset the first alternative to match wins, so longer hashes are tried before
+# shorter ones, urls and email addresses before the domains inside them, and so on.
+# the lookarounds stand in for the old whitespace tokenization, letting iocs touch
+# punctuation without matching fragments of longer tokens.  every pattern must start
+# at a position not preceded by a word character, which the scanner checks first.
+
+ipv4_pattern = r'(?:(?:[0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5])\.){3}(?:25[0-5]|2[0-4][0-9]|1[0-9]{2}|[1-9][0-9]|[0-9])'
+domain_pattern = r'(?:[a-zA-Z0-9\-]{2,}\.)+[a-zA-Z]{2,}'
+path_chars = r'[^\\/:*?"<>|\s]'
+
+scan_patterns = [
+
+    ('sha512', r'(?<![0-9a-zA-Z_])[a-fA-F0-9]{128}(?![0-9a-zA-Z_])'),
+    ('sha256', r'(?<![0-9a-zA-Z_])[a-fA-F0-9]{64}(?![0-9a-zA-Z_])'),
+    ('sha1', r'(?<![0-9a-zA-Z_])[a-fA-F0-9]{40}(?![0-9a-zA-Z_])'),
+    ('md5', r'(?<![0-9a-zA-Z_])[a-fA-F0-9]{32}(?![0-9a-zA-Z_])'),
+    ('ssdeep', r'(?<![0-9a-zA-Z_])[0-9]{1,10}:[a-zA-Z0-9/+]{3,64}:[a-zA-Z0-9/+]{3,64}(?![0-9a-zA-Z_/+:])'),
+    ('cidr', r'(?<![0-9a-zA-Z_.])' + ipv4_pattern + r'/(?:3[0-2]|[12][0-9]|[0-9])(?![0-9a-zA-Z_/])'),
+    ('ip', r'(?<![0-9a-zA-Z_.])' + ipv4_pattern + r'(?!\.?[0-9a-zA-Z_])'),
+    ('ipv6', r'(?<![0-9a-zA-Z_:.])[a-fA-F0-9]{0,4}(?::[a-fA-F0-9]{0,4}){2,7}(?![0-9a-zA-Z_:.])'),
+    ('url', r'(?<![0-9a-zA-Z_])(?:https?|ftps?)://[^\s<>"\'{}|\\^`]*[^\s<>"\'{}|\\^`.,;:!?)]'),
+    ('email', r'(?<![0-9a-zA-Z_.%+\-])[a-zA-Z0-9_%+\-][a-zA-Z0-9._%+\-]*@' + domain_pattern + r'(?!\.?[0-9a-zA-Z_\-])'),
+    ('cve', r'(?<![0-9a-zA-Z_])cve[\-_:]?\d{4}[\-_:]\d{4,}(?![0-9a-zA-Z_])'),
+    ('bitcoin', r'(?<![0-9a-zA-Z_])(?:[13][a-km-zA-HJ-NP-Z1-9]{25,34}|bc1[ac-hj-np-z02-9]{11,71})(?![0-9a-zA-Z_])'),
+    ('registry', r'(?<![0-9a-zA-Z_])(?:HKEY_LOCAL_MACHINE|HKEY_CURRENT_USER|HKEY_CLASSES_ROOT|HKEY_USERS|HKEY_CURRENT_CONFIG|HKLM|HKCU|HKCR|HKCC|HKU)(?:\\[^\\\s<>"|*?]+)+(?<![.,;:!?)])'),
+    ('filepath', r'(?<![0-9a-zA-Z_])(?:[a-zA-Z]:|%[a-zA-Z_]+%)\\(?:' + path_chars + r'+\\)*' + path_chars + r'*(?<![.,;!?)])'),
+    ('domain', r'(?<![0-9a-zA-Z_.\-])' + domain_pattern + r'(?!\.?[0-9a-zA-Z_\-])')
+
+]
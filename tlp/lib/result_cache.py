@@ -0,0 +1,139 @@
+__author__ = "{ ministry of promise }"
+__copyright__ = "Copyright 2015, { ministry of promise }"
+__license__ = "MIT"
+__version__ = "0.1.0"
+__maintainer__ = "Adam Nichols"
+__email__ = "adam.j.nichols@gmail.com"
+__status__ = "Development"
+
+import os,errno,threading,tempfile
+import cPickle as pickle
+
+
+class ResultCache:
+    '''
+    content-addressed, size-bounded cache of analysis results on local disk.
+
+    entries are pickled dicts stored as <path>/<key[:2]>/<key>, keyed by a hash of
+    the input text and everything that can change the result (see TLP.cache_key).
+    reading an entry refreshes its mtime, and once the cache grows past max_bytes
+    the least recently used entries are deleted.
+    '''
+
+    def __init__(self, path, max_bytes=256 * 1024 * 1024):
+
+        try:
+            self.path = path
+            self.max_bytes = max_bytes
+            self._lock = threading.Lock()
+            if not os.path.isdir(path):
+                os.makedirs(path)
+            self._size = sum([size for (mtime, size, entry) in self._entries()])
+
+        except Exception as e:
+            raise e
+
+
+    def _entry_path(self, key):
+        return os.path.join(self.path, key[:2], key)
+
+
+    def _entries(self):
+
+        for (dirpath, dirnames, filenames) in os.walk(self.path):
+            for filename in filenames:
+                if filename.startswith('.'):
+                    continue
+                entry = os.path.join(dirpath, filename)
+                try:
+                    st = os.stat(entry)
+                except OSError:
+                    continue
+                yield (st.st_mtime, st.st_size, entry)
+
+
+    def get(self, key):
+        '''returns the cached dict for key, or None'''
+
+        try:
+            entry = self._entry_path(key)
+            try:
+                with open(entry, 'rb') as f:
+                    value = pickle.load(f)
+            except IOError as e:
+                if e.errno == errno.ENOENT:
+                    return None
+                raise
+            except (EOFError, pickle.UnpicklingError):
+                return None
+
+            try:
+                os.utime(entry, None)
+            except OSError:
+                pass
+            return value
+
+        except Exception as e:
+            raise e
+
+
+    def put(self, key, value):
+
+        try:
+            entry = self._entry_path(key)
+            directory = os.path.dirname(entry)
+            if not os.path.isdir(directory):
+                try:
+                    os.makedirs(directory)
+                except OSError as e:
+                    if e.errno != errno.EEXIST:
+                        raise
+
+            try:
+                previous = os.path.getsize(entry)
+            except OSError:
+                previous = 0
+
+            (fd, tmp_path) = tempfile.mkstemp(dir=directory, prefix='.')
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(value, f, pickle.HIGHEST_PROTOCOL)
+            size = os.path.getsize(tmp_path)
+            os.rename(tmp_path, entry)
+
+            with self._lock:
+                self._size += size - previous
+                if self._size > self.max_bytes:
+                    self._evict()
+
+        except Exception as e:
+            raise e
+
+
+    def _evict(self):
+        '''deletes least recently used entries until the cache is back to 90% of max_bytes'''
+
+        entries = sorted(self._entries())
+        self._size = sum([size for (mtime, size, entry) in entries])
+        for (mtime, size, entry) in entries:
+            if self._size <= self.max_bytes * .9:
+                break
+            try:
+                os.remove(entry)
+                self._size -= size
+            except OSError:
+                pass
+
+
+    def clear(self):
+
+        with self._lock:
+            for (mtime, size, entry) in list(self._entries()):
+                try:
+                    os.remove(entry)
+                except OSError:
+                    pass
+            self._size = 0
+
+
+    def __len__(self):
+        return len(list(self._entries()))
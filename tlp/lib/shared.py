@@ -0,0 +1,29 @@
+__author__ = "{ ministry of promise }"
+__copyright__ = "Copyright 2015, { ministry of promise }"
+__license__ = "MIT"
+__version__ = "0.1.0"
+__maintainer__ = "Adam Nichols"
+__email__ = "adam.j.nichols@gmail.com"
+__status__ = "Development"
+
+import threading
+
+# process-wide, read-only state (stopwords, taggers, compiled filter lists) that is
+# expensive to build and safe to share between every TLP and TLPFilter instance
+
+_shared = dict()
+
+# reentrant, since building one shared object may need another
+_shared_lock = threading.RLock()
+
+
+def shared(name, build):
+    '''returns the process-wide object registered as name, building it on first use'''
+
+    try:
+        return _shared[name]
+    except KeyError:
+        with _shared_lock:
+            if name not in _shared:
+                _shared[name] = build()
+            return _shared[name]
@@ -0,0 +1,86 @@
+__author__ = "{ ministry of promise }"
+__copyright__ = "Copyright 2015, { ministry of promise }"
+__license__ = "MIT"
+__version__ = "0.1.0"
+__maintainer__ = "Adam Nichols"
+__email__ = "adam.j.nichols@gmail.com"
+__status__ = "Development"
+
+
+class SuffixIndex:
+    '''
+    hashed index of domains keyed by their reversed labels ('www.cisco.com' is
+    stored as u'com.cisco.www').  a lookup walks the labels of a candidate from
+    the tld inward, so answering "is this domain, or any parent of it, indexed"
+    costs one set probe per label regardless of how many domains are indexed.
+    '''
+
+    def __init__(self, domains=None):
+
+        try:
+            self._keys = set()
+            if domains is not None:
+                for domain in domains:
+                    self.add(domain)
+
+        except Exception as e:
+            raise e
+
+
+    @classmethod
+    def from_keys(cls, keys):
+        '''builds an index straight from the reversed-label keys of another, see keys()'''
+
+        index = cls()
+        index._keys = set(keys)
+        return index
+
+
+    def keys(self):
+        return self._keys
+
+
+    @staticmethod
+    def _labels(domain):
+        '''returns the lowercased, reversed labels of a domain'''
+
+        labels = domain.strip().strip('.').lower().split('.')
+        labels.reverse()
+        return labels
+
+
+    def add(self, domain):
+
+        try:
+            labels = self._labels(domain)
+            if len(labels[0]) == 0:
+                return
+            self._keys.add(u'.'.join(labels))
+
+        except Exception as e:
+            raise e
+
+
+    def match(self, domain):
+        '''returns the indexed domain that covers the supplied domain, or None'''
+
+        try:
+            key = None
+            for label in self._labels(domain):
+                key = label if key is None else key + u'.' + label
+                if key in self._keys:
+                    labels = key.split('.')
+                    labels.reverse()
+                    return u'.'.join(labels)
+            return None
+
+        except Exception as e:
+            raise e
+
+
+    def __contains__(self, domain):
+        return self.match(domain) is not None
+
+
+    def __len__(self):
+        return len(self._keys)
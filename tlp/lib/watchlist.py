@@ -0,0 +1,210 @@
+__author__ = "{ ministry of promise }"
+__copyright__ = "Copyright 2015, { ministry of promise }"
+__license__ = "MIT"
+__version__ = "0.1.0"
+__maintainer__ = "Adam Nichols"
+__email__ = "adam.j.nichols@gmail.com"
+__status__ = "Development"
+
+import codecs
+from array import array
+
+# automaton edges live in one dict keyed by node * RADIX + character, which is far
+# smaller than a dict per node once the watchlist runs to hundreds of thousands of entries
+
+RADIX = 0x110000
+
+
+def _is_word(ch):
+    return ch.isalnum() or ch == u'_'
+
+
+class Watchlist:
+    '''
+    aho-corasick automaton over a list of known indicators (domains, hashes, strings).
+
+    search() reports every indicator found in a text, with its offsets, in a single
+    pass whose cost depends on the length of the text and the number of hits, not on
+    the number of indicators.  unless case_sensitive is set, indicators and text are
+    compared lowercased.  with boundaries set, an indicator that starts or ends with a
+    word character only matches where it isn't part of a longer word, so 'evil.com'
+    is found in 'sub.evil.com' but not in 'notevil.com'.
+    '''
+
+    def __init__(self, indicators=None, case_sensitive=False, boundaries=True):
+
+        try:
+            self.case_sensitive = case_sensitive
+            self.boundaries = boundaries
+            self._keys = dict()
+            self._indicators = []
+            self._labels = []
+            self._compiled = False
+            if indicators is not None:
+                for indicator in indicators:
+                    self.add(indicator)
+
+        except Exception as e:
+            raise e
+
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        '''
+        loads one indicator per line, optionally followed by a tab and a label.  blank
+        lines and lines starting with # are skipped
+        '''
+
+        try:
+            watchlist = cls(**kwargs)
+            with codecs.open(path, 'r', 'utf-8') as f:
+                for line in f:
+                    line = line.rstrip(u'\r\n')
+                    if len(line.strip()) == 0 or line.startswith(u'#'):
+                        continue
+                    (indicator, tab, label) = line.partition(u'\t')
+                    watchlist.add(indicator.strip(), label.strip() if tab else None)
+            return watchlist
+
+        except Exception as e:
+            raise e
+
+
+    def add(self, indicator, label=None):
+
+        try:
+            if not type(indicator) is unicode:
+                indicator = indicator.decode('utf8')
+            if len(indicator) == 0:
+                raise ValueError('empty indicator supplied')
+
+            key = self._fold(indicator)
+            if key in self._keys:
+                self._labels[self._keys[key]] = label
+                return
+            self._keys[key] = len(self._indicators)
+            self._indicators.append(indicator)
+            self._labels.append(label)
+            self._compiled = False
+
+        except Exception as e:
+            raise e
+
+
+    def _fold(self, text):
+        return text if self.case_sensitive else text.lower()
+
+
+    def compile(self):
+        '''builds the automaton - done on first search, and again after indicators are added'''
+
+        try:
+            goto = dict()
+            children = [[]]
+            term = array('l', [-1])
+
+            for (key, pattern) in self._keys.iteritems():
+                node = 0
+                for ch in key:
+                    edge = node * RADIX + ord(ch)
+                    child = goto.get(edge)
+                    if child is None:
+                        child = len(children)
+                        goto[edge] = child
+                        children.append([])
+                        term.append(-1)
+                        children[node].append((ord(ch), child))
+                    node = child
+                term[node] = pattern
+
+            # breadth first, so each node's failure link is set before its children need it
+            fail = array('l', [0] * len(children))
+            link = array('l', [0] * len(children))
+            queue = [child for (c, child) in children[0]]
+            for node in queue:
+                for (c, child) in children[node]:
+                    f = fail[node]
+                    while f and (f * RADIX + c) not in goto:
+                        f = fail[f]
+                    f = goto.get(f * RADIX + c, 0)
+                    fail[child] = f
+                    link[child] = f if term[f] >= 0 else link[f]
+                    queue.append(child)
+
+            (self._goto, self._fail, self._term, self._link) = (goto, fail, term, link)
+            self._compiled = True
+
+        except Exception as e:
+            raise e
+
+
+    def state(self):
+        '''returns a fresh scan state, for feeding a document through scan() in pieces'''
+        return dict({'node': 0, 'offset': 0})
+
+
+    def scan(self, text, state=None):
+        '''
+        yields (start, end, pattern) for every indicator ending in text, without any
+        boundary checks.  successive calls sharing a state continue where the last left
+        off, with offsets counted from the start of the first piece
+        '''
+
+        if not self._compiled:
+            self.compile()
+        if state is None:
+            state = self.state()
+
+        (goto, fail, term, link) = (self._goto, self._fail, self._term, self._link)
+        keys = self._indicators
+        node = state['node']
+        offset = state['offset']
+        for (i, ch) in enumerate(self._fold(text)):
+            c = ord(ch)
+            while node and (node * RADIX + c) not in goto:
+                node = fail[node]
+            node = goto.get(node * RADIX + c, 0)
+            out = node if term[node] >= 0 else link[node]
+            while out:
+                pattern = term[out]
+                end = offset + i + 1
+                yield (end - len(keys[pattern]), end, pattern)
+                out = link[out]
+        state['node'] = node
+        state['offset'] = offset + len(text)
+
+
+    def hit(self, text, start, end, pattern):
+        '''
+        returns (start, end, indicator, label) for a scanned match, or None if it falls
+        inside a longer word.  text is the whole document the match offsets refer to
+        '''
+
+        if self.boundaries:
+            indicator = self._indicators[pattern]
+            if start > 0 and _is_word(indicator[0]) and _is_word(text[start - 1]):
+                return None
+            if end < len(text) and _is_word(indicator[-1]) and _is_word(text[end]):
+                return None
+        return (start, end, self._indicators[pattern], self._labels[pattern])
+
+
+    def search(self, text):
+        '''returns (start, end, indicator, label) for every watchlist hit in text, in order'''
+
+        try:
+            if not type(text) is unicode:
+                text = text.decode('utf8')
+            hits = [self.hit(text, start, end, pattern) for (start, end, pattern) in self.scan(text)]
+            return sorted([h for h in hits if h is not None])
+
+        except Exception as e:
+            raise e
+
+
+    def __contains__(self, indicator):
+        return self._fold(indicator) in self._keys
+
+
+    def __len__(self):
+        return len(self._indicators)
@@ -6,14 +6,20 @@ leveraging the amazing textblob and nltk natural language processing modules to
 context and color around those iocs. 
 '''
 
-import nltk,re,operator,math,pprint
-import numpy as np
+import re,operator,math,pprint,time,hashlib
 from tlp_filter import TLPFilter
-from nltk.corpus import stopwords
-from nltk.util import ngrams
 from collections import Counter
-from textblob import TextBlob
-from lib.regex_list import regexs
+from contextlib import contextmanager
+from lib.lru_cache import LRUCache
+from lib.ioc_set import IOCSet
+from lib.shared import shared
+from lib.document import Document
+from lib.ioc_scanner import IOCScanner
+from lib.lazy_import import lazy_import
+
+# imported when a stage first needs them, see lib.lazy_import
+nltk = lazy_import('nltk')
+np = lazy_import('numpy')
 
 __author__ = "{ ministry of promise }"
 __copyright__ = "Copyright 2015, { ministry of promise }"
@@ -23,67 +29,475 @@ __maintainer__ = "Adam Nichols"
 __email__ = "adam.j.nichols@gmail.com"
 __status__ = "Development"
 
+# iocs that end within this many characters of the end of the text may still grow
+# when more text is appended, so they are rescanned by TLP.append (see lib.ioc_scanner)
+
+IOC_OVERLAP = 1024
+
+# monotonic where the platform has it
+timer = getattr(time, 'monotonic', time.time)
+
+# word -> (first token, pos tag) memo, shared by every TLP in the process so
+# that common vocabulary is only ever tagged once
+
+pos_memo = LRUCache(100000)
+
+
+def perceptron_tagger():
+    '''returns the tagger behind nltk.pos_tag, loaded once per process'''
+    return shared('perceptron_tagger', lambda: nltk.tag.perceptron.PerceptronTagger())
+
+
+def pos_tag_words(words, stats=None):
+    '''returns {word: (token, pos)} for words, tagging uncached words in one batch'''
+
+    tagged = dict()
+    misses = list()
+    for word in words:
+        tag = pos_memo.get(word)
+        if tag is None:
+            misses.append(word)
+        else:
+            tagged[word] = tag
+
+    if stats is not None:
+        stats['pos_memo_hits'] += len(tagged)
+        stats['pos_tagged'] += len(misses)
+
+    if len(misses) > 0:
+        # each word is still tagged as its own sentence, as the per-word
+        # pos_tag() calls did, but the tagger is only loaded once
+        tokens = [nltk.word_tokenize(word) for word in misses]
+        misses = [word for (word, t) in zip(misses, tokens) if len(t) > 0]
+        tokens = [t for t in tokens if len(t) > 0]
+        tagger = perceptron_tagger()
+        for word, pos_array in zip(misses, [tagger.tag(t) for t in tokens]):
+            tagged[word] = pos_array[0]
+            pos_memo.set(word, pos_array[0])
+
+    return tagged
+
+
 class TLP:
 
-    def __init__(self, raw_text=None, text_title=None):
+    def __init__(self, raw_text=None, text_title=None, source=None, tlpfilter=None, cache=None, watchlist=None):
 
         try:
             # props for internal use
             self._raw_text = raw_text
             self._text_title = text_title
+            self._source = source
 
             # props to store data
-            self._summary = str()
-            self._keywords = set()
+            self._summary = None
+            self._keywords = None
             self._iocs = dict()
             self._tlp = None
-            self._debug = dict({'iocs': dict(), 'keywords': dict()})
+            self._debug = dict({'iocs': dict(), 'keywords': dict(), 'timing': dict(), 'counters': Counter()})
 
+            # pipeline stages (clean text, blobs, ...) are built on first use
+            self._stages = dict()
+
+            self._tlpfilter = tlpfilter
+            self._watchlist = watchlist
             if self._raw_text != None:
                 if not type(self._raw_text) is unicode:
                     self._raw_text = self._raw_text.decode('utf8')
-                self._tlpfilter = TLPFilter()
-                self._clean_text = self._tlpfilter.text(self._raw_text)
-                self._blob = TextBlob(self._raw_text)
-                self._clean_blob = TextBlob(self._clean_text)
+                if self._tlpfilter is None:
+                    self._tlpfilter = TLPFilter()
+
+            # results already computed for the same text and filter, see cache_key
+            self._cache = cache
+            self._cached = dict()
+            self._cache_hash = None
+            if self._cache is not None and self._raw_text is not None and self._tlpfilter.fingerprint is not None:
+                self._cache_hash = hashlib.sha256(__version__ + self._tlpfilter.fingerprint)
+                self._cache_hash.update(self._raw_text.encode('utf8'))
+                self._load_cached()
 
         except Exception as e:
             import traceback
             traceback.print_exc()
 
 
+    @staticmethod
+    def batch(documents, workers=None, chunksize=1, ordered=True, stages=None):
+        '''
+        analyzes an iterable of documents across a pool of worker processes,
+        yielding one picklable result dict per document - see tlp_batch.batch
+        '''
+
+        from tlp_batch import batch, STAGES
+        return batch(documents, workers=workers, chunksize=chunksize, ordered=ordered,
+                     stages=stages if stages is not None else STAGES)
+
+
+    @staticmethod
+    def stream_iocs(source, chunk_size=65536, tlpfilter=None, unique=True):
+        '''
+        yields (type, ioc) pairs from a file-like object or iterable of chunks in
+        bounded memory - see tlp_stream.stream_iocs
+        '''
+
+        from tlp_stream import stream_iocs
+        return stream_iocs(source, chunk_size=chunk_size, tlpfilter=tlpfilter, unique=unique)
+
+
+    '''
+    pipeline stages
+
+    each stage is computed the first time something asks for it, then memoized, so
+    callers that only want iocs never pay for text cleaning or nlp.
+    '''
+
+    def _stage(self, name, build):
+
+        if name not in self._stages:
+            with self._timing(name):
+                self._stages[name] = build()
+        return self._stages[name]
+
+
+    @contextmanager
+    def _timing(self, name):
+        '''adds the wall time of the enclosed block to debug['timing'][name]'''
+
+        start = timer()
+        try:
+            yield
+        finally:
+            stage = self._debug['timing'].setdefault(name, dict({'calls': 0, 'seconds': 0.0}))
+            stage['calls'] += 1
+            stage['seconds'] += timer() - start
+
+
+    @property
+    def _clean_state(self):
+        return self._stage('clean_state', lambda: self._clean_append(self._tlpfilter.text_state(), self._raw_text))
+
+
+    def _clean_append(self, state, text):
+        self._tlpfilter.clean_append(state, text, stats=self._debug['counters'], source=self._source)
+        return state
+
+
+    @property
+    def _clean_text(self):
+
+        def build():
+            state = self._clean_state
+            # repeats are judged over the whole document, so count them afresh each time
+            stats = Counter()
+            clean_text = self._tlpfilter.dedupe_lines(state['lines'] + state['tail_lines'], stats=stats)
+            self._debug['counters']['lines_dropped_repeat'] = stats['lines_dropped_repeat']
+            return clean_text
+
+        return self._stage('clean_text', build)
+
+
+    @property
+    def _document(self):
+        '''the raw text, tokenized once for every stage that reads it (see lib.document)'''
+        return self._stage('document', lambda: Document(self._raw_text))
+
+
+    @property
+    def _clean_document(self):
+        return self._stage('clean_document', lambda: Document(self._clean_text))
+
+
+    @property
+    def _sentences(self):
+        return self._clean_document.sentences
+
+
+    @property
+    def _ioc_state(self):
+        return self._stage('ioc_state', lambda: self._scan_iocs(dict({'counts': dict((k, Counter()) for k in self._tlpfilter.extractors.names),
+                                                                      'scanner': IOCScanner(self._tlpfilter, IOC_OVERLAP),
+                                                                      'provisional': list(), 'post_stats': Counter()}),
+                                                                self._raw_text))
+
+
+    def _scan_iocs(self, state, text):
+        '''
+        scans text appended to the document for iocs, updating the per-ioc occurrence
+        counts in state.  matches near the end are counted for now, and taken back
+        when the next append scans them again (see lib.ioc_scanner).  returns state
+        '''
+
+        counters = self._debug['counters']
+        with self._timing('iocs.scan'):
+            for (name, ioc) in state['provisional']:
+                state['counts'][name][ioc] -= 1
+                if state['counts'][name][ioc] == 0:
+                    del state['counts'][name][ioc]
+            counters['ioc_candidates'] -= len(state['provisional'])
+
+            (settled, provisional, scanned) = state['scanner'].feed(text)
+            for (name, ioc) in settled + provisional:
+                state['counts'].setdefault(name, Counter())[ioc] += 1
+            counters['ioc_candidates'] += len(settled) + len(provisional)
+            counters['chars_scanned'] += scanned
+            state['provisional'] = provisional
+
+        return state
+
+
+    @property
+    def _color_state(self):
+        return self._stage('color_state', lambda: self._color_append(dict({'colors': set(), 'next': 0})))
+
+
+    def _color_append(self, state):
+        '''
+        collects the token following each tlp marker in the document's tokens, up to
+        the last one - it may continue into the next append, so it's left to color
+        '''
+
+        document = self._document
+        tokens = document.tokens
+        complete = len(tokens) - 1 if document.ends_in_token() else len(tokens)
+        for i in xrange(state['next'], complete - 1):
+            if re.search('(?:tlp|TLP)', tokens[i]):
+                state['colors'].add(tokens[i + 1].lower())
+        state['next'] = max(state['next'], complete - 1)
+        return state
+
+
+    @property
+    def _watch_state(self):
+        return self._stage('watch_state', lambda: self._watch_append(dict({'scan': self._watchlist.state(), 'matches': []}), self._raw_text))
+
+
+    def _watch_append(self, state, text):
+        state['matches'].extend(self._watchlist.scan(text, state['scan']))
+        return state
+
+
+    @property
+    def _keyword_state(self):
+        return self._stage('keyword_state', lambda: self._count_keywords(dict({'counts': Counter(), 'open': u'', 'provisional': None}),
+                                                                        self._raw_text, self._document))
+
+
+    @property
+    def _keyword_counts(self):
+        return self._keyword_state['counts']
+
+
+    def _count_keywords(self, state, text, document=None):
+        '''
+        adds the keywords of text appended to the document to the counts in state.
+        a word the text ends inside may go on in the next append, so it is counted
+        for now and taken back then, to be counted again whole.  returns state
+        '''
+
+        counters = self._debug['counters']
+        if state['provisional'] is not None:
+            (counts, scanned, dropped) = state['provisional']
+            state['counts'].subtract(counts)
+            for word in counts:
+                if state['counts'][word] <= 0:
+                    del state['counts'][word]
+            counters['words_scanned'] -= scanned
+            counters['keywords_dropped_filter'] -= dropped
+
+        text = state['open'] + text
+        document = document if document is not None else Document(text)
+        state['counts'].update(self._filter_keywords(document.words, counters))
+
+        # ending inside a word leaves it open
+        state['open'] = re.search(r'\S*$', text).group() if document.ends_in_token() else u''
+        state['provisional'] = None
+        if len(state['open']) > 0:
+            words = Document(state['open']).words
+            filtered = self._tlpfilter.keywords(words)
+            state['provisional'] = (Counter(filtered), len(words), len(words) - len(filtered))
+        return state
+
+
+    def _filter_keywords(self, words, counters):
+
+        counters['words_scanned'] += len(words)
+        with self._timing('keywords.filter'):
+            filtered = self._tlpfilter.keywords(words)
+        counters['keywords_dropped_filter'] += len(words) - len(filtered)
+        return filtered
+
+
+    @property
+    def cache_key(self):
+        '''returns the result cache key for this document, or None if it isn't cacheable'''
+
+        if self._cache_hash is None:
+            return None
+        return self._cache_hash.hexdigest()
+
+
+    def _load_cached(self):
+
+        entry = self._cache.get(self.cache_key)
+        if entry is None:
+            return
+        self._cached = entry
+        self._iocs = entry.get('iocs', dict())
+        self._keywords = entry.get('keywords')
+        self._summary = entry.get('summary')
+        if 'debug' in entry:
+            self._debug = entry['debug']
+
+
+    def _remember(self, name, value):
+        '''stores a computed result, with the debug info so far, in the result cache'''
+
+        if self._cache_hash is None:
+            return
+        self._cached[name] = value
+        self._cached['debug'] = self._debug
+        self._cache.put(self.cache_key, self._cached)
+
+
+    def append(self, text):
+        '''
+        adds text to the end of the document.  whatever has already been computed is
+        updated from the new text alone: ioc counts, keyword counts, tlp colors and the
+        cleaned lines.  document-wide results (summary, repeated line removal, keyword
+        stats) are redone lazily from those on next access.  text may start in the
+        middle of a word, or of an ioc, that the document ended in.
+        '''
+
+        try:
+            if not type(text) is unicode:
+                text = text.decode('utf8')
+            if self._raw_text is None:
+                self.__init__(text, self._text_title, self._source, self._tlpfilter, self._cache, self._watchlist)
+                return self
+
+            # cached results were for the shorter text.  no stage was built for them, so
+            # their debug info goes too and everything is computed afresh on next access
+            if len(self._cached) > 0:
+                self._cached = dict()
+                self._debug = dict({'iocs': dict(), 'keywords': dict(), 'timing': dict(), 'counters': Counter()})
+            if self._cache_hash is not None:
+                self._cache_hash.update(text.encode('utf8'))
+            self._iocs = dict()
+
+            with self._timing('append'):
+                self._raw_text += text
+
+                if 'document' in self._stages:
+                    self._document.append(text)
+
+                if 'clean_state' in self._stages:
+                    self._clean_append(self._clean_state, text)
+
+                if 'ioc_state' in self._stages:
+                    self._scan_iocs(self._ioc_state, text)
+
+                if 'color_state' in self._stages:
+                    self._color_append(self._color_state)
+
+                if 'watch_state' in self._stages:
+                    self._watch_append(self._watch_state, text)
+
+                if 'keyword_state' in self._stages:
+                    self._count_keywords(self._keyword_state, text)
+
+                # everything else is rebuilt on demand
+                for stage in ('clean_text', 'clean_document', 'text', 'ioc_offsets'):
+                    self._stages.pop(stage, None)
+                self._summary = None
+                self._keywords = None
+
+            return self
+
+        except Exception as e:
+            raise e
+
+
     @property 
     def iocs(self):
-        '''returns a filtered list of iocs'''
+        '''returns the filtered iocs, as a dict of ioc type to IOCSet'''
 
         try:
             if len(self._iocs) > 0:
                 return self._iocs
     
-            # prime the dict
-            self._iocs = dict((k, set()) for k in regexs)
-            
-            # parse iocs
-            data = self._tlpfilter.iocs(self._raw_text, mode='pre')
-            for w in data:
-                for name,pattern in regexs.iteritems():
-                    if pattern.match(w):
-                         self._iocs[name].add(w)
-            self._iocs = self._tlpfilter.iocs(self._iocs, mode='post')
-            for key in self._iocs:
-                self._debug['iocs'][key] = len(self._iocs[key])
+            with self._timing('iocs'):
+                state = self._ioc_state
+                iocs = dict((name, set(counts)) for (name, counts) in state['counts'].iteritems())
+
+                # the post filter runs again after every append, so swap its counts rather than adding them
+                stats = Counter()
+                with self._timing('iocs.post_filter'):
+                    iocs = self._tlpfilter.iocs(iocs, mode='post', stats=stats)
+                self._iocs = dict((name, IOCSet(name, values)) for (name, values) in iocs.iteritems())
+                self._debug['counters'].subtract(state['post_stats'])
+                self._debug['counters'].update(stats)
+                state['post_stats'] = stats
+
+                for key in self._iocs:
+                    self._debug['iocs'][key] = len(self._iocs[key])
+            self._remember('iocs', self._iocs)
             return self._iocs
 
         except Exception as e:
             raise e
 
 
+    @property
+    def ioc_offsets(self):
+        '''returns (start, end, ioc) for every occurrence of each filtered ioc, as offsets into the raw text'''
+
+        try:
+            iocs = self.iocs
+            return self._stage('ioc_offsets', lambda: self._find_iocs(iocs))
+
+        except Exception as e:
+            raise e
+
+
+    def _find_iocs(self, iocs):
+
+        found = dict((name, list()) for name in iocs)
+        if len(self._raw_text) == 0:
+            return found
+        (data, offsets, consumed) = self._tlpfilter.refang(self._raw_text)
+        for (name, start, end, ioc) in self._tlpfilter.extractors.scan(data):
+            if ioc in iocs.get(name, ()):
+                (start, end) = offsets.span(start, end)
+                found[name].append((start, end, ioc))
+        return found
+
+
+    @property
+    def watchlist_hits(self):
+        '''returns (start, end, indicator, label) for every watchlist indicator in the raw text'''
+
+        try:
+            if self._watchlist is None:
+                raise ValueError('no watchlist supplied')
+
+            with self._timing('watchlist'):
+                # boundaries are checked against the whole text, since a match at the
+                # end of one appended piece may turn out to be part of a longer word
+                hits = [self._watchlist.hit(self._raw_text, start, end, pattern)
+                        for (start, end, pattern) in self._watch_state['matches']]
+                hits = sorted([h for h in hits if h is not None])
+                self._debug['counters']['watchlist_hits'] = len(hits)
+            return hits
+
+        except Exception as e:
+            raise e
+
+
     @property
     def text(self):
         '''returns the complete filtered text'''
 
         try:
-            return "  ".join([s.raw for s in self._clean_blob.sentences])
+            return self._stage('text', lambda: "  ".join([s.raw for s in self._sentences]))
 
         except Exception as e:
             raise e
@@ -91,7 +505,11 @@ class TLP:
 
     @property
     def debug(self):
-        '''returns debug info -  must run 'keywords' or 'iocs' to populate'''
+        '''
+        returns debug info -  must run 'keywords' or 'iocs' to populate.  'timing' holds
+        wall time and call counts per pipeline stage (stage times include any stages
+        they build), 'counters' holds tokens/candidates seen and items dropped per filter
+        '''
         return self._debug
 
 
@@ -100,18 +518,21 @@ class TLP:
         '''returns document summary'''
 
         try:
-            if len(self._summary) > 0:
+            if self._summary is not None:
                 return self._summary
             
-            sentences = self._clean_blob.sentences
-            slen = len(sentences)
-            sixth_pctl = int(math.floor(slen * .06))
-            if sixth_pctl < 8:
-                summ_len = sixth_pctl if sixth_pctl > 2 else 2
-            else:
-                summ_len = 8
+            with self._timing('summary'):
+                sentences = self._sentences
+                slen = len(sentences)
+                sixth_pctl = int(math.floor(slen * .06))
+                if sixth_pctl < 8:
+                    summ_len = sixth_pctl if sixth_pctl > 2 else 2
+                else:
+                    summ_len = 8
             
-            return "  ".join([s.raw for s in sentences[:summ_len]])
+                self._summary = "  ".join([s.raw for s in sentences[:summ_len]])
+            self._remember('summary', self._summary)
+            return self._summary
 
         except Exception as e:
             raise e
@@ -122,13 +543,17 @@ class TLP:
         '''returns tlp color (if present)'''
 
         try:
-            bigrams = ngrams(self._raw_text.split(), 2)
-            colors = set()
-            for b in bigrams:
-                (one, two) = b
-                if re.search('(?:tlp|TLP)', one): 
-                    colors.add(two.lower())
+            if 'color' in self._cached:
+                return set(self._cached['color'])
+
+            with self._timing('color'):
+                state = self._color_state
+                colors = set(state['colors'])
+                tokens = self._document.tokens
+                if self._document.ends_in_token() and len(tokens) > 1 and re.search('(?:tlp|TLP)', tokens[-2]):
+                    colors.add(tokens[-1].lower())
                 
+            self._remember('color', colors)
             return colors 
 
         except Exception as e:
@@ -140,42 +565,42 @@ class TLP:
         '''returns document keywords and occurance counts'''
 
         try:
-            if len(self._keywords) > 0:
+            if self._keywords is not None:
                 return self._keywords
     
-            #blob = TextBlob(self.summary)
-            blob = TextBlob(self._clean_text)
-            keywords = self._blob.words
-            keywords = self._tlpfilter.keywords(keywords)
-            keywords_counted = dict(Counter(keywords))
-            total_count = 0
-            keywords_dict = dict()
-            for word, count in keywords_counted.iteritems():
+            with self._timing('keywords'):
+                counters = self._debug['counters']
+                keywords_counted = self._keyword_counts
+                with self._timing('keywords.pos_tag'):
+                    pos_tags = pos_tag_words([word for word in keywords_counted if len(word) > 0], stats=counters)
+                total_count = 0
+                keywords_dict = dict()
+                for word, count in keywords_counted.iteritems():
     
-                if len(word) == 0:
-                    continue
+                    if word not in pos_tags:
+                        continue
         
-                # you're certainly not popular if you only occur once
-                # if you are popular, and you're longer than 3 chars, you win
+                    # you're certainly not popular if you only occur once
+                    # if you are popular, and you're longer than 3 chars, you win
     
-                total_count += count if count > 1 else 0
-                pos_array = nltk.pos_tag(nltk.word_tokenize(word))
-                w,pos = pos_array[0]
-                if re.search('.*[NN|NP]$', pos):
-                    if len(w) > 3:
-                        keywords_dict[word] = count 
+                    total_count += count if count > 1 else 0
+                    w,pos = pos_tags[word]
+                    if re.search('.*[NN|NP]$', pos):
+                        if len(w) > 3:
+                            keywords_dict[word] = count 
             
-            keyword_scores = [v for (k,v) in keywords_dict.iteritems()]
-            keywords_count = np.count_nonzero(keyword_scores)
-            keywords_mean = np.mean(keyword_scores)
-            keywords_std = np.std(keyword_scores)
+                keyword_scores = [v for (k,v) in keywords_dict.iteritems()]
+                keywords_count = np.count_nonzero(keyword_scores)
+                keywords_mean = np.mean(keyword_scores)
+                keywords_std = np.std(keyword_scores)
     
-            self._debug['keywords']['total'] = sum(keyword_scores)
-            self._debug['keywords']['mean'] = keywords_mean
-            self._debug['keywords']['std'] = keywords_std
+                self._debug['keywords']['total'] = sum(keyword_scores)
+                self._debug['keywords']['mean'] = keywords_mean
+                self._debug['keywords']['std'] = keywords_std
             
-            new_dict = dict([(k,v) for (k,v) in keywords_dict.iteritems() if v > (keywords_mean + (keywords_std * 4))])
-            self._keywords = sorted(new_dict.items(), key=operator.itemgetter(1), reverse = True)
+                new_dict = dict([(k,v) for (k,v) in keywords_dict.iteritems() if v > (keywords_mean + (keywords_std * 4))])
+                self._keywords = sorted(new_dict.items(), key=operator.itemgetter(1), reverse = True)
+            self._remember('keywords', self._keywords)
     
             return self._keywords
             
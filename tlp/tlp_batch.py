@@ -0,0 +1,305 @@
+#!/usr/bin/env python
+
+'''
+tlp is a python library that parses a body of text for indicators of compromise (iocs), 
+leveraging the amazing textblob and nltk natural language processing modules to derive 
+context and color around those iocs. 
+'''
+
+import multiprocessing,threading,traceback,itertools,Queue
+from multiprocessing.pool import ThreadPool
+from tlp import TLP, perceptron_tagger
+from tlp_filter import TLPFilter, english_stopwords
+
+__author__ = "{ ministry of promise }"
+__copyright__ = "Copyright 2015, { ministry of promise }"
+__license__ = "MIT"
+__version__ = "0.1.0"
+__maintainer__ = "Adam Nichols"
+__email__ = "adam.j.nichols@gmail.com"
+__status__ = "Development"
+
+# TLP properties a batch can compute, in the order they are run.  debug goes last
+# so that it reflects every stage computed before it.
+
+STAGES = ('iocs', 'keywords', 'summary', 'color', 'debug')
+
+
+def warm(stages=STAGES):
+    '''loads the heavy, shared state once per worker, before its first document'''
+
+    # public suffix list, known good domains
+    TLPFilter()
+    if 'keywords' in stages or 'summary' in stages:
+        english_stopwords()
+    if 'keywords' in stages:
+        perceptron_tagger()
+
+
+def analyze(job):
+    '''
+    runs the requested stages over a single document.  failures are returned
+    in the result, so one bad document never takes down the batch.
+    '''
+
+    (index, document, stages) = job
+    result = dict({'index': index, 'error': None})
+
+    try:
+        # TLP() logs and swallows a bad document, which would surface here as an
+        # unrelated error from the first stage - check it first, so the real one is kept
+        if type(document) is str:
+            document = document.decode('utf8')
+        elif not type(document) is unicode:
+            raise TypeError('supplied document of type %s, not str or unicode' % type(document).__name__)
+
+        tlp = TLP(document)
+        for stage in STAGES:
+            if stage in stages:
+                result[stage] = getattr(tlp, stage)
+
+    except Exception as e:
+        result['error'] = traceback.format_exc()
+
+    return result
+
+
+def batch(documents, workers=None, chunksize=1, ordered=True, stages=STAGES):
+    '''
+    fans documents out across a pool of worker processes, yielding a result dict
+    per document with its input 'index', an 'error' (None on success) and one
+    key per requested stage.  results come back in input order, or as they
+    complete if ordered is False.  workers=1 runs in-process.
+    '''
+
+    try:
+        for stage in stages:
+            if stage not in STAGES:
+                raise ValueError('invalid stage specified: %s' % stage)
+
+        jobs = ((index, document, tuple(stages)) for (index, document) in enumerate(documents))
+
+        if workers == 1:
+            warm(stages)
+            for job in jobs:
+                yield analyze(job)
+            return
+
+        pool = multiprocessing.Pool(processes=workers, initializer=warm, initargs=(tuple(stages),))
+        try:
+            imap = pool.imap if ordered else pool.imap_unordered
+            for result in imap(analyze, jobs, chunksize):
+                yield result
+            pool.close()
+        finally:
+            pool.terminate()
+            pool.join()
+
+    except Exception as e:
+        raise e
+
+
+class AnalysisCancelled(Exception):
+    pass
+
+
+class PendingAnalysis:
+    '''handle on a document submitted to an Analyzer'''
+
+    def __init__(self, index, async_result=None):
+        self.index = index
+        self._async_result = async_result
+        self._cancelled = False
+
+
+    def ready(self):
+        return self._async_result.ready()
+
+
+    def cancel(self):
+        '''discards the result - a document already running in a worker still finishes'''
+        self._cancelled = True
+
+
+    def cancelled(self):
+        return self._cancelled
+
+
+    def get(self, timeout=None):
+
+        if self._cancelled:
+            raise AnalysisCancelled('analysis of document %d was cancelled' % self.index)
+        return self._async_result.get(timeout)
+
+
+class Analyzer:
+    '''
+    long-lived, non-blocking front end to a worker pool, for services that cannot
+    block while a report is parsed.
+
+    submit() returns immediately with a PendingAnalysis, and runs the optional
+    callback from the pool's result thread when the document is done - event
+    loops should hand it back to themselves (e.g. loop.call_soon_threadsafe).
+    no more than max_in_flight documents are queued or running at once; past
+    that, submit() blocks (or raises Queue.Full with block=False), which gives
+    the producer backpressure.  executor is 'process' for cpu-bound work, or
+    'thread' to keep everything in the calling process.
+    '''
+
+    def __init__(self, workers=None, max_in_flight=None, stages=STAGES, executor='process'):
+
+        try:
+            for stage in stages:
+                if stage not in STAGES:
+                    raise ValueError('invalid stage specified: %s' % stage)
+
+            self.stages = tuple(stages)
+            if executor == 'process':
+                self._pool = multiprocessing.Pool(processes=workers, initializer=warm, initargs=(self.stages,))
+            elif executor == 'thread':
+                warm(self.stages)
+                self._pool = ThreadPool(processes=workers)
+            else:
+                raise ValueError('invalid executor specified')
+
+            if max_in_flight is None:
+                max_in_flight = (workers or multiprocessing.cpu_count()) * 4
+            self._slots = threading.BoundedSemaphore(max_in_flight)
+            self._counter = itertools.count()
+            self._cancelled = False
+
+        except Exception as e:
+            raise e
+
+
+    def submit(self, document, callback=None, block=True, timeout=None):
+        '''queues a document for analysis, waiting for a free slot if max_in_flight are busy'''
+
+        try:
+            self._check()
+
+            if not self._acquire(block, timeout):
+                raise Queue.Full('too many documents in flight')
+
+            pending = PendingAnalysis(next(self._counter))
+
+            def done(result):
+                self._slots.release()
+                if callback is not None and not pending.cancelled():
+                    # this runs on the pool's result thread, which an exception would
+                    # kill - and every result after it, with no error to show for it
+                    try:
+                        callback(result)
+                    except Exception as e:
+                        traceback.print_exc()
+
+            pending._async_result = self._pool.apply_async(analyze, ((pending.index, document, self.stages),), callback=done)
+            return pending
+
+        except Exception as e:
+            raise e
+
+
+    def _check(self):
+        '''raises if no more results will arrive - the analyzer was cancelled, or its pool died'''
+
+        if self._cancelled:
+            raise AnalysisCancelled('analyzer has been cancelled')
+        if not self._pool._result_handler.is_alive():
+            raise RuntimeError('worker pool is no longer returning results')
+
+
+    def _acquire(self, block, timeout):
+
+        if not block:
+            return self._slots.acquire(False)
+        if timeout is None:
+            # poll so that a cancel from another thread, or a dead pool, is noticed
+            while not self._slots.acquire(False):
+                self._check()
+                threading.Event().wait(0.01)
+            return True
+        waited = 0.0
+        while not self._slots.acquire(False):
+            self._check()
+            if waited >= timeout:
+                return False
+            threading.Event().wait(0.01)
+            waited += 0.01
+        return True
+
+
+    def imap(self, documents, ordered=True):
+        '''
+        yields a result dict per document while documents are still being read,
+        never holding more than max_in_flight of them at once
+        '''
+
+        try:
+            results = Queue.Queue()
+            submitted = dict()
+            buffered = dict()
+            # the next input position to release, when ordered
+            state = dict({'next': 0})
+
+            for (position, document) in enumerate(documents):
+                pending = self.submit(document, callback=results.put)
+                submitted[pending.index] = position
+                while True:
+                    try:
+                        result = results.get_nowait()
+                    except Queue.Empty:
+                        break
+                    for r in self._order(result, submitted, buffered, state, ordered):
+                        yield r
+
+            while len(submitted) > 0:
+                try:
+                    result = results.get(True, 0.1)
+                except Queue.Empty:
+                    self._check()
+                    continue
+                for r in self._order(result, submitted, buffered, state, ordered):
+                    yield r
+
+        except Exception as e:
+            raise e
+
+
+    def _order(self, result, submitted, buffered, state, ordered):
+        '''maps a pool result back to its input position, releasing it when its turn comes'''
+
+        result['index'] = submitted.pop(result['index'])
+        if not ordered:
+            yield result
+            return
+        buffered[result['index']] = result
+        while state['next'] in buffered:
+            yield buffered.pop(state['next'])
+            state['next'] += 1
+
+
+    def cancel(self):
+        '''stops accepting documents and abandons everything queued or running'''
+
+        self._cancelled = True
+        self._pool.terminate()
+
+
+    def close(self):
+        '''waits for everything submitted to finish, then shuts the workers down'''
+
+        self._pool.close()
+        self._pool.join()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, tb):
+
+        if exc_type is None:
+            self.close()
+        else:
+            self.cancel()
@@ -6,17 +6,23 @@ leveraging the amazing textblob and nltk natural language processing modules to
 context and color around those iocs. 
 '''
 
-from textblob import TextBlob
-from textblob import Sentence
-from textblob import WordList
-from textblob import Word
-from nltk.corpus import stopwords as sw
 from collections import Counter
-from Levenshtein import distance
 from lib.filter_list import *
-from pkg_resources import resource_filename, Requirement
-import numpy as np
-import types,re,operator,codecs
+from lib.regex_list import scan_patterns
+from lib.suffix_index import SuffixIndex
+from lib.public_suffix import PublicSuffixList, public_suffix_list
+from lib.shared import shared
+from lib.bloom_filter import BloomFilter
+from lib.refang import refang, defang_patterns
+from lib.extractors import default_extractors
+from lib.compiled_data import load as load_compiled_data, file_digest, SOURCES
+from lib.document import Document
+from lib.lazy_import import lazy_import
+import types,re,operator,codecs,hashlib
+
+# imported when a stage first needs them, see lib.lazy_import
+textblob = lazy_import('textblob')
+np = lazy_import('numpy')
 
 __author__ = "{ ministry of promise }"
 __copyright__ = "Copyright 2015, { ministry of promise }"
@@ -26,49 +32,250 @@ __maintainer__ = "Adam Nichols"
 __email__ = "adam.j.nichols@gmail.com"
 __status__ = "Development"
 
+# a newline before a capital or a digit - the text filter's line-joining rule never
+# removes one, so it splits a document into independently cleanable parts
+
+hard_break = re.compile(r'\n(?=[A-Z0-9])')
+
+# character classes for the junk ratio: whitespace, the [a-zA-Z0-9] that nonalpha_pct
+# looks for, and everything else.  unicode whitespace past ascii is listed separately
+
+SPACE, ALNUM, OTHER = 0, 1, 2
+wide_spaces = [0x85, 0xa0, 0x1680, 0x180e, 0x2028, 0x2029, 0x202f, 0x205f, 0x3000] + range(0x2000, 0x200b)
+
+
+def _ascii_classes():
+
+    classes = np.empty(128, dtype=np.int8)
+    for c in xrange(128):
+        classes[c] = SPACE if unichr(c).isspace() else ALNUM if chr(c).isalnum() else OTHER
+    return classes
+
+
+def line_token_counts(lines):
+    '''
+    counts, per line, the whitespace tokens with and without an ascii alphanumeric and
+    the alphanumeric and other non-space characters - in one numpy pass over the lines'
+    encoded text.  returns the four arrays (alnum_tokens, nonalpha_tokens, alnum_chars,
+    other_chars)
+    '''
+
+    n = len(lines)
+    encoded = u'\n'.join(lines).encode('utf-32-le')
+    if len(encoded) == 0:
+        return tuple(np.zeros(n) for i in xrange(4))
+    codes = np.frombuffer(encoded, dtype=np.uint32)
+
+    classes = shared('ascii_classes', _ascii_classes)[np.minimum(codes, 127)]
+    wide = codes >= 128
+    classes[wide] = OTHER
+    if wide.any():
+        classes[np.in1d(codes, wide_spaces)] = SPACE
+
+    # the newline before a line counts towards it, but as whitespace it never matters
+    line = np.cumsum(codes == 10)
+    alnum = classes == ALNUM
+    alnum_chars = np.bincount(line, weights=alnum, minlength=n)
+    other_chars = np.bincount(line, weights=classes == OTHER, minlength=n)
+
+    nonspace = classes != SPACE
+    starts = np.flatnonzero(nonspace & ~np.concatenate(([False], nonspace[:-1])))
+    if len(starts) == 0:
+        return (np.zeros(n), np.zeros(n), alnum_chars, other_chars)
+    token_alnum = np.maximum.reduceat(alnum, starts)
+    alnum_tokens = np.bincount(line[starts], weights=token_alnum, minlength=n)
+    nonalpha_tokens = np.bincount(line[starts], minlength=n) - alnum_tokens
+
+    return (alnum_tokens, nonalpha_tokens, alnum_chars, other_chars)
+
+
+def split_lazily(text, sep=u' '):
+    '''yields the same pieces as text.split(sep), one at a time'''
+
+    start = 0
+    while True:
+        end = text.find(sep, start)
+        if end < 0:
+            yield text[start:]
+            return
+        yield text[start:end]
+        start = end + len(sep)
+
+def compiled_data():
+    '''returns the precompiled filter tables (see lib.compiled_data), or None if they're missing or stale'''
+    return shared('compiled_data', load_compiled_data)
+
+
+def _compiled(name, build):
+    '''a table from the precompiled filter data, or built from source if it isn't there'''
+
+    tables = compiled_data()
+    if tables is not None and name in tables:
+        return tables[name]
+    return build()
+
+
+def english_stopwords():
+    '''returns the nltk english stopwords as a set, loaded once per process'''
+    return shared('stopwords', lambda: _compiled('stopwords', lambda: frozenset(lazy_import('nltk.corpus').stopwords.words("english"))))
+
+
+def default_domain_filterlist():
+    '''returns the index of built-in known good domains, built once per process'''
+    return shared('domain_filterlist', lambda: SuffixIndex.from_keys(_compiled('domain_filterlist',
+                  lambda: SuffixIndex(alexa_filterlist + ioc_filterlist['domain']).keys())))
+
+
+def default_public_suffixes():
+    '''returns the public suffix list, built once per process'''
+    return shared('public_suffixes', lambda: PublicSuffixList.from_trie(_compiled('public_suffixes',
+                  lambda: public_suffix_list().trie())))
+
+
+def default_keyword_filterlist():
+    '''returns the built-in keyword filterlist as a set, built once per process'''
+    return shared('keyword_filterlist', lambda: frozenset(_compiled('keyword_filterlist', lambda: keyword_filterlist)))
+
+
+def default_extractor_registry():
+    '''returns the frozen registry of built-in ioc extractors shared by filters that don't supply their own'''
+    return shared('extractors', lambda: default_extractors().freeze())
+
+
+def filter_data_version():
+    '''returns a digest of the built-in filter lists, suffix list, ioc and defang patterns, computed once per process'''
+
+    def build():
+        digest = hashlib.sha1()
+        digest.update(repr((file_digest(SOURCES), scan_patterns, defang_patterns)))
+        return digest.hexdigest()
+
+    return shared('filter_data_version', build)
+
+
 class TLPFilter:
 
-    def __init__(self, user_filterlist=None):
+    def __init__(self, user_filterlist=None, edit_ratio=0.35, boilerplate=None, filterlist_backend='set', filterlist_error_rate=0.001,
+                 extractors=None, domain_allowlist=None):
 
         try:
             # initialize some junk
             self.user_filterlist = None
-            self.ubl_file_obj = None
-            self.global_filterlist = list()
+            self.edit_ratio = edit_ratio
+            self.boilerplate = boilerplate
+            self.public_suffixes = default_public_suffixes()
+            self.extractors = extractors.freeze() if extractors is not None else default_extractor_registry()
+
+            # known good domains, on top of the built-in ones - a list, or a file with one
+            # per line.  'rank,domain' lines (top-1m lists) are taken by their last field.
+            # a million entries is fine, since lookups cost one probe per label regardless
+
+            self.domain_filterlist = default_domain_filterlist()
+            allowlist_digest = hashlib.sha1()
+            if domain_allowlist is not None:
+
+                if type(domain_allowlist) in (list, tuple, set):
+                    domains = domain_allowlist
+                elif type(domain_allowlist) is str:
+                    domains = (line.rsplit(u',', 1)[-1] for line in self.filterlist_file(domain_allowlist))
+                else:
+                    raise ValueError("supplied domain allowlist is not of type <str> or <list>")
+
+                self.domain_filterlist = SuffixIndex.from_keys(self.domain_filterlist.keys())
+                for domain in domains:
+                    domain = domain.strip().lower()
+                    if not type(domain) is unicode:
+                        domain = domain.decode('utf8')
+                    self.domain_filterlist.add(domain)
+                    allowlist_digest.update(domain.encode('utf8') + '\n')
 
-            # check for filterlist, handle accordingly
+            # check for filterlist, handle accordingly.  entries go in a hashed set, or for
+            # lists too big to hold as unicode objects, a bloom filter - a false positive
+            # there drops a line of text that should have been kept
 
+            entries = list()
             if user_filterlist is not None:
 
                 self.user_filterlist = user_filterlist
 
-                if type(self.user_filterlist) is list:
-                    pass
+                if type(self.user_filterlist) in (list, tuple, set):
+                    entries = self.user_filterlist
                 elif type(self.user_filterlist) is str:
-                    self.ubl_file_obj = open(self.user_filterlist, "r")
-                    for line in self.ubl_file_obj.readlines():
-                        if re.match('^#', line):
-                            continue
-                        self.global_filterlist.append(unicode(line.strip().lower()))
-                        #self.global_filterlist + keyword_filterlist
+                    entries = self.filterlist_file(self.user_filterlist)
                 else:
                     raise ValueError("supplied blacklist is not of type <str> or <list>")
 
+            filterlist_digest = hashlib.sha1()
+
+            def normalized():
+                for entry in entries:
+                    entry = entry.strip().lower()
+                    if not type(entry) is unicode:
+                        entry = entry.decode('utf8')
+                    filterlist_digest.update(entry.encode('utf8') + '\n')
+                    yield entry
+
+            # nothing is added once the filter is built - a document's repeated lines only
+            # ever go in its own scratch state - so one filter can serve any number of
+            # documents, from any number of threads, with the same results in any order
+            if filterlist_backend == 'set':
+                self.global_filterlist = frozenset(normalized())
+            elif filterlist_backend == 'bloom':
+                if type(self.user_filterlist) is str:
+                    capacity = sum(1 for entry in self.filterlist_file(self.user_filterlist))
+                else:
+                    capacity = len(entries)
+                # a filter of a few dozen bits hashes too coarsely to keep to its error
+                # rate, so short lists get one sized for 10000 entries (~18kB at 0.1%)
+                self.global_filterlist = BloomFilter(max(capacity, 10000), filterlist_error_rate)
+                for entry in normalized():
+                    self.global_filterlist.add(entry)
+            else:
+                raise ValueError('filterlist_backend must be set or bloom')
+
+            self._config_digest = repr((filter_data_version(), self.edit_ratio, filterlist_backend,
+                                        filterlist_error_rate, filterlist_digest.hexdigest(), allowlist_digest.hexdigest()))
+
         except Exception as e:
             raise e
 
 
+    @property
+    def fingerprint(self):
+        '''
+        digest of everything about this filter that can change a result, for result caching.
+        a boilerplate store changes as it learns, so results using one aren't cacheable
+        '''
+
+        if self.boilerplate is not None:
+            return None
+        return hashlib.sha1(self._config_digest + self.extractors.fingerprint()).hexdigest()
+
+
     '''
     utility functions
     
     misc. stuff used elsewhere:
             - nonalpha_pct: function to determine the ratio of non-alpha tokens in a sentence
+            - nonalpha_keep: applies the nonalpha cutoff to many lines at once
             - nonalpha_thresh: analyzes each sentence in a blob and derives the threshold  
               ratio of junk tokens per sentence.
             - moz_tlds: return a list of tlds from the mozilla project tld list 
               maintained at https://publicsuffix.org/list/effective_tld_names.dat
     '''
 
+    @staticmethod
+    def filterlist_file(path):
+        '''yields the entries of a filterlist file, one per line, skipping blanks and # comments'''
+
+        with codecs.open(path, 'r', 'utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if len(line) == 0 or line.startswith(u'#'):
+                    continue
+                yield line
+
+
     def nonalpha_pct(self, sentence):
 
         try:
@@ -87,7 +294,40 @@ class TLPFilter:
             raise e
 
 
+    def nonalpha_keep(self, lines):
+        '''
+        returns, for each line, whether its nonalpha_pct is under the cutoff of len(line)/4.
+
+        the word tokenizer only ever splits whitespace tokens, so a line has at least as
+        many alphanumeric tokens as whitespace tokens with an alphanumeric, and at most
+        as many nonalpha tokens as it has other characters - and the reverse bounds hold
+        too.  those bounds, computed in bulk by line_token_counts, settle most lines;
+        only the rest are tokenized
+        '''
+
+        try:
+            (alnum_tokens, nonalpha_tokens, alnum_chars, other_chars) = line_token_counts(lines)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                most = other_chars / (other_chars + alnum_tokens) * 100
+                least = nonalpha_tokens / (nonalpha_tokens + alnum_chars) * 100
+
+            keep = list()
+            for (i, line) in enumerate(lines):
+                cutoff = len(line) / 4
+                if most[i] < cutoff:
+                    keep.append(True)
+                elif least[i] >= cutoff:
+                    keep.append(False)
+                else:
+                    keep.append(self.nonalpha_pct(textblob.Sentence(line)) < cutoff)
+            return keep
+
+        except Exception as e:
+            raise e
+
+
     def nonalpha_thresh(self, blob):
+        '''blob is a TextBlob, or anything else with sentences - such as a lib.document.Document'''
 
         try:
             sentences = blob.sentences
@@ -104,6 +344,7 @@ class TLPFilter:
     def moz_tlds(self):
 
         try:
+            from pkg_resources import resource_filename, Requirement
             effective_tld_names = resource_filename(Requirement.parse('tlp'), 'tlp/lib/effective_tld_names.dat')
             f = codecs.open(effective_tld_names, 'r', 'utf-8')
             moz_tlds = f.readlines()
@@ -129,7 +370,12 @@ class TLPFilter:
     that should be removed from the statistical analysis of text to produce summary and keywords.
     '''
 
-    def text(self, text):
+    def text(self, text, stats=None, source=None, compute_thresh=False):
+        '''
+        returns the filtered text.  the document's nonalpha_thresh used to be derived
+        along the way, but nothing consumes it and it costs a punkt pass over the whole
+        text, so it is skipped unless compute_thresh is set
+        '''
 
         try:
             # check for text, transform to unicode if necessary 
@@ -141,23 +387,90 @@ class TLPFilter:
                         text = text.decode('utf8')
     
                     # unicode?  unicode.
-                    blob = TextBlob(text)
-                    blob_nonalpha_thresh = self.nonalpha_thresh(blob)
+                    if compute_thresh:
+                        document = Document(text)
+                        blob_nonalpha_thresh = self.nonalpha_thresh(document)
             else:
                 raise ValueError("no input text supplied")
-             
-                   
+
+            state = self.text_state()
+            lines = self.clean_append(state, text, stats=stats, source=source)
+            return self.dedupe_lines(lines, stats=stats)
+
+        except Exception as e:
+            raise e
+
+
+    def text_state(self):
+        '''returns empty per-document state, for cleaning a document a piece at a time with clean_append'''
+        return dict({'lines': list(), 'tail': u'', 'tail_lines': list(), 'tail_stats': Counter(), 'seen': set()})
+
+
+    def clean_append(self, state, text, stats=None, source=None):
+        '''
+        cleans text appended to a document, updating state in place, and returns the
+        cleaned lines of the whole document so far (see dedupe_lines for the rest).
+
+        the line-joining rule never removes a newline that comes before a capital or
+        a digit, so everything up to the last of those is settled for good - only
+        the text after it is ever cleaned again on the next append.
+        '''
+
+        try:
+            tail = state['tail'] + text
+            settled = None
+            for m in hard_break.finditer(tail):
+                settled = m.end()
+            if settled is not None:
+                state['lines'] += self.clean_lines(tail[:settled], stats=stats, source=source, seen=state['seen'], settled=True)
+                tail = tail[settled:]
+
+            # the tail is re-cleaned every time, so swap its counts rather than adding them
+            tail_stats = Counter()
+            state['tail'] = tail
+            state['tail_lines'] = self.clean_lines(tail, stats=tail_stats, source=source, seen=state['seen'])
+            if stats is not None:
+                stats.subtract(state['tail_stats'])
+                stats.update(tail_stats)
+            state['tail_stats'] = tail_stats
+
+            return state['lines'] + state['tail_lines']
+
+        except Exception as e:
+            raise e
+
+
+    def clean_lines(self, text, stats=None, source=None, seen=None, settled=False):
+        '''
+        applies the per-line rules (boilerplate, headings, junk ratio) to a run of
+        text, returning the lines that survive.  settled text ends at a hard line
+        break, which doesn't start a line of its own.
+        '''
+
+        try:
             # replace all instances of sentences broken by newline
             # to ensure that we're dealing with contiguous text 
     
             s1_text = re.sub(r'([a-z\,]+)[\n\r]+?([^A-Z0-9]+?)', r'\1 \2', text)
             s1_list = list()
+            s1_lines = s1_text.split('\n')
+            if settled:
+                s1_lines.pop()
+            lines_scanned = len(s1_lines)
+
+            # drop lines this source is known to repeat across documents, then
+            # teach the store this document's lines
+            if self.boilerplate is not None:
+                seen = seen if seen is not None else set()
+                known = [self.boilerplate.is_boilerplate(line, source, seen) for line in s1_lines]
+                self.boilerplate.learn(s1_lines, source, seen)
+                s1_lines = [line for (line, boilerplate) in zip(s1_lines, known) if not boilerplate]
     
             # try to remove header-type section labels through the use of some convoluted
             # rule bs.  really not elegant, but it works.
          
-            stopwords = sw.words("english")
-            for sentence in s1_text.split('\n'):
+            stopwords = english_stopwords()
+            for sentence in s1_lines:
                 # line begins or ends with a number - maybe ToC or heading
                 if re.match('(?:^[0-9]+?|[0-9]+?[\n\r]+?$)', sentence):
                     continue
@@ -181,8 +494,24 @@ class TLPFilter:
     
             # let's clear out anything with a nonalpha token ratio higher than the threshold
             
-            s2_list = [s for s in s1_list if self.nonalpha_pct(Sentence(s)) < (len(s)/4)]
-                    
+            s2_list = [s for (s, keep) in zip(s1_list, self.nonalpha_keep(s1_list)) if keep]
+
+            if stats is not None:
+                stats['lines_scanned'] += lines_scanned
+                stats['lines_dropped_boilerplate'] += lines_scanned - len(s1_lines)
+                stats['lines_dropped_heading'] += len(s1_lines) - len(s1_list)
+                stats['lines_dropped_nonalpha'] += len(s1_list) - len(s2_list)
+
+            return s2_list
+
+        except Exception as e:
+            raise e
+
+
+    def dedupe_lines(self, s2_list, stats=None):
+        '''drops the repeated lines (headers/footers/copyrights) of a document, returning its clean text'''
+
+        try:
             # now that we've got a semi-clean set of data, we can do some statistical analysis
             # to determine if we've got a lot of repeat data like headers/footers/copyrights
             # that can skew our keyword stats
@@ -205,14 +534,28 @@ class TLPFilter:
                 # we are removing all the noise we can
     
                 sentence_outliers = [k.strip().lower() for (k,v) in sentence_counts.iteritems() if v >= (sc_median + (sc_std * 2)) > 1]
-                self.global_filterlist += sentence_outliers
+                outliers = set(sentence_outliers)
+
+                # a near-duplicate of an outlier (page numbers, dates, ...) is within
+                # edit_ratio of its length in edits.  lsh over character bigrams only picks
+                # which outliers to measure: an edit changes at most two bigrams, so such a
+                # line keeps about 1 - 2 * edit_ratio of them.  bigrams alone can't decide -
+                # a long paragraph holds most common ones, and would match any other
+                from lib.minhash import MinHashIndex
+                from lib.edit_distance import edit_distance
+                near_duplicates = MinHashIndex(threshold=max(1 - 2 * self.edit_ratio, 0.05), shingle_size=2)
+                for o in sentence_outliers:
+                    near_duplicates.add(o)
+
                 for s in s2_list:
-                    if s.lower() in self.global_filterlist:
+                    lowered = s.lower()
+                    if lowered in outliers or lowered in self.global_filterlist:
+                        continue
+                    limit = len(s) * self.edit_ratio
+                    if any(edit_distance(o, lowered, limit) < limit for o in near_duplicates.candidates(lowered)):
                         continue
                     for o in sentence_outliers:
-                        if distance(o, s.lower()) < float(len(s) * .35):
-                            break
-                        elif o in s.lower():
+                        if o in lowered:
                             break
                     else:
                         final_list.append(s)
@@ -221,6 +564,9 @@ class TLPFilter:
             else:
                 final_list = s2_list
     
+            if stats is not None:
+                stats['lines_dropped_repeat'] += len(s2_list) - len(final_list)
+
             # we out
             return " ".join(final_list)
 
@@ -232,11 +578,11 @@ class TLPFilter:
 
         try:
             if keywords is not None:
-                if not (isinstance(keywords, list) or isinstance(keywords, WordList)):
+                if not (isinstance(keywords, list) or isinstance(keywords, textblob.WordList)):
                     raise TypeError('supplied keyword object of type that is not list or TextBlob.WordList')
                 else:
                     if isinstance(keywords, list):
-                        keywords = [Word(word.lower()) for word in keywords]
+                        keywords = [textblob.Word(word.lower()) for word in keywords]
             else:
                 raise ValueError('no input keywords supplied')
     
@@ -244,21 +590,11 @@ class TLPFilter:
             words = [word.lower() for word in keywords]
     
             # remove all stopwords
-            stopwords = sw.words("english")
+            stopwords = english_stopwords()
             words = [word for word in words if word not in stopwords] 
             #words = [word for word in keywords] 
-            nwords = []
-            for word in words:
-                if word in keyword_filterlist:
-                #if word.string in keyword_filterlist:
-                    continue
-                for term in self.global_filterlist:
-                    #if word.string in term:
-                    if word in term:
-                        pass
-                        #break
-                else:
-                    nwords.append(word)
+            filterlist = default_keyword_filterlist()
+            nwords = [word for word in words if word not in filterlist]
     
             # remove plural, reduce to stems
             # textblob breaks possessives and other contractions into 
@@ -273,7 +609,69 @@ class TLPFilter:
             raise e
 
 
-    def iocs(self, data, mode):
+    def normalize(self, data):
+        '''returns the text cleaned for ioc parsing: defanged iocs restored, whitespace flattened'''
+
+        try:
+            return self.refang(data)[0]
+
+        except Exception as e:
+            raise e
+
+
+    def refang(self, data, final=True):
+        '''
+        ioc pre-filter, returning (normalized, offsets, consumed) - see lib.refang.refang.
+        offsets maps positions in the normalized text back to data
+        '''
+
+        try:
+            if not data or type(data) is not unicode:
+                raise ValueError('invalid data supplied')
+
+            return refang(data, final)
+
+        except Exception as e:
+            raise e
+
+
+    def keep_ioc(self, name, ioc, stats=None):
+        '''
+        post-filter for a single ioc - returns False for good sites and blacklisted iocs.
+        drops are counted per filter in stats, if supplied
+        '''
+
+        try:
+            dropped_by = None
+            if name == 'domain':
+                # equal to, or a subdomain of, a known good domain
+                if ioc in self.domain_filterlist:
+                    dropped_by = 'iocs_dropped_allowlist'
+
+                # no public suffix, no domain
+                elif ioc not in self.public_suffixes:
+                    dropped_by = 'iocs_dropped_public_suffix'
+
+            elif name == 'ip':
+                if ioc in ioc_filterlist['ip']:
+                    dropped_by = 'iocs_dropped_filterlist'
+
+            if dropped_by is None:
+                return True
+            if stats is not None:
+                stats[dropped_by] += 1
+            return False
+
+        except Exception as e:
+            raise e
+
+
+    def iocs(self, data, mode, stats=None, lazy=False):
+        '''
+        pre: returns the normalized text split on spaces, as a list - or with lazy,
+        as a generator, which never holds a second copy of a large buffer.
+        post: drops the iocs in data that the filterlists rule out
+        '''
 
         try:
             if not (mode == 'pre' or mode == 'post'):
@@ -285,18 +683,10 @@ class TLPFilter:
                 if not data or type(data) is not unicode:
                     raise ValueError('invalid data supplied')
     
-                # stupid "object replacement character" -- essentially a utf space
-                data = [re.sub(ur'\uFFFC+', ' ', w) for w in data]
-
-                # other whitespace
-                data = [re.sub(ur'[\s\t\n\r]', ' ', w) for w in data]
-
-                # remove the neuter braces, if present
-                data = [re.sub(ur'[\[\]]+', '', w) for w in data]
-
-                data = "".join(data).split(' ')
-    
-                return data
+                data = self.normalize(data)
+                if lazy:
+                    return split_lazily(data)
+                return data.split(u' ')
     
             # post-filter to remove good sites, and other blacklisted iocs
             if mode == 'post':
@@ -304,28 +694,10 @@ class TLPFilter:
                 if not type(data) is dict or data is None:
                     raise ValueError('invalid data supplied')
         
-                # filter domain
-                moz_tlds = self.moz_tlds()
-                for ioc in data['domain'].copy():
-                    filterlist = alexa_filterlist + ioc_filterlist['domain']
-                    for domain in filterlist:
-                        re_match = ur'.*' + re.escape(domain) + '$'
-                        if re.match(re_match, ioc):
-                            data['domain'].remove(ioc)
-                            break
-    
-                    for tld in moz_tlds:
-                        re_match = ur'.*\.?' + re.escape(tld) + '$'
-                        if re.match(re_match, ioc):
-                            break
-                    else:
-                        data['domain'].remove(ioc)
-
-                # filter ip
-                for ioc in data['ip'].copy():
-                    filterlist = ioc_filterlist['ip']
-                    if ioc in filterlist:
-                        data['ip'].remove(ioc)     
+                for name in data:
+                    for ioc in data[name].copy():
+                        if not self.keep_ioc(name, ioc, stats):
+                            data[name].remove(ioc)
     
                 return data
 
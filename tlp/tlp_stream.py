@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+
+'''
+tlp is a python library that parses a body of text for indicators of compromise (iocs), 
+leveraging the amazing textblob and nltk natural language processing modules to derive 
+context and color around those iocs. 
+'''
+
+import codecs
+from tlp_filter import TLPFilter
+from lib.ioc_scanner import IOCScanner
+
+__author__ = "{ ministry of promise }"
+__copyright__ = "Copyright 2015, { ministry of promise }"
+__license__ = "MIT"
+__version__ = "0.1.0"
+__maintainer__ = "Adam Nichols"
+__email__ = "adam.j.nichols@gmail.com"
+__status__ = "Development"
+
+
+def chunks(source, chunk_size):
+    '''yields blocks from a file-like object, an iterable of chunks, or a single string'''
+
+    if isinstance(source, basestring):
+        yield source
+    elif hasattr(source, 'read'):
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    else:
+        for chunk in source:
+            yield chunk
+
+
+def stream_iocs(source, chunk_size=65536, overlap=1024, tlpfilter=None, unique=True):
+    '''
+    yields (type, ioc) pairs from a file-like object or an iterable of chunks,
+    without ever holding more than a chunk plus overlap of text in memory.
+
+    chunks go through the same scanner as TLP.append, so an ioc split across
+    chunks is still found whole - see lib.ioc_scanner, including for iocs longer
+    than overlap.  with unique=True each ioc is yielded once, which costs a set
+    of the distinct iocs seen so far; unique=False keeps memory flat regardless
+    of input.
+    '''
+
+    try:
+        tlpfilter = tlpfilter if tlpfilter is not None else TLPFilter()
+        scanner = IOCScanner(tlpfilter, overlap)
+        decoder = codecs.getincrementaldecoder('utf8')('replace')
+        seen = dict((k, set()) for k in tlpfilter.extractors.names)
+
+        def emit(name, ioc):
+            if unique:
+                if ioc in seen.setdefault(name, set()):
+                    return False
+                seen[name].add(ioc)
+            return tlpfilter.keep_ioc(name, ioc)
+
+        for chunk in chunks(source, chunk_size):
+            if type(chunk) is not unicode:
+                chunk = decoder.decode(chunk)
+            if len(chunk) == 0:
+                continue
+            # provisional matches come back settled from a later chunk
+            (settled, provisional, scanned) = scanner.feed(chunk)
+            for (name, ioc) in settled:
+                if emit(name, ioc):
+                    yield (name, ioc)
+
+        (settled, provisional, scanned) = scanner.feed(decoder.decode('', final=True), final=True)
+        for (name, ioc) in settled:
+            if emit(name, ioc):
+                yield (name, ioc)
+
+    except Exception as e:
+        raise e